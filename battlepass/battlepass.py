@@ -127,7 +127,7 @@ class BattlePass(commands.Cog):
                 for _ in range(quantity):
                     user_inv.append(item_id)
 
-                await shop_cog.config.user(ctx.author).inventory.set(user_inv)
+                await shop_cog.set_inventory(ctx.author, user_inv)
                 item_name = shop_cog.shop_items[item_id]["name"]
                 message = f"🎁 Received {quantity}x {item_name}!"
             else:
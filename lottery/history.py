@@ -0,0 +1,62 @@
+import mmap
+import numpy as np
+from pathlib import Path
+from typing import Dict
+
+# One fixed-width, little-endian record per draw
+RECORD = np.dtype([
+    ("time", "<f8"),            # Draw timestamp
+    ("digits", "u1", (5,)),     # Winning numbers
+    ("tickets", "<u4"),         # Tickets in the draw
+    ("winners", "<u4"),         # Winning tickets
+    ("pool", "<i8"),            # Total prize pool (after multiplier)
+    ("payout", "<i8"),          # Credits paid out
+])
+
+
+class DrawHistory:
+    """Append-only per-guild draw archive that is read through mmap"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def path(self, guild_id: int) -> Path:
+        return self.directory / f"{guild_id}.bin"
+
+    def append(self, guild_id: int, time: float, digits, tickets: int,
+               winners: int, pool: int, payout: int):
+        """Append a draw record"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = np.array([(time, digits, tickets, winners, pool, payout)], dtype=RECORD)
+        with self.path(guild_id).open("ab") as f:
+            f.write(record.tobytes())
+
+    def scan(self, guild_id: int, recent: int = 10) -> Dict:
+        """Read the whole archive in one zero-copy pass
+
+        Returns the total draw count, the `recent` newest records (newest first),
+        a 5x10 array of how often each digit won at each position, and totals.
+        """
+        path = self.path(guild_id)
+        if not path.exists() or path.stat().st_size < RECORD.itemsize:
+            return {"draws": 0, "recent": [], "frequency": np.zeros((5, 10), dtype=np.int64),
+                    "tickets": 0, "payout": 0}
+
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Ignore a trailing partial record left by an interrupted write
+            count = len(mm) // RECORD.itemsize
+            records = np.frombuffer(mm, dtype=RECORD, count=count)
+            offsets = np.arange(5) * 10
+            frequency = np.bincount(
+                (records["digits"] + offsets).ravel(), minlength=50
+            ).reshape(5, 10)
+            result = {
+                "draws": count,
+                "recent": records[-recent:][::-1].copy() if recent > 0 else [],
+                "frequency": frequency,
+                "tickets": int(records["tickets"].sum()),
+                "payout": int(records["payout"].sum()),
+            }
+            # Drop the view before the map closes
+            del records
+        return result
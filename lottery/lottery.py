@@ -1,35 +1,127 @@
 import asyncio
+import functools
+import multiprocessing
 import random
+import site
 import discord
+import numpy as np
 import time
-from redbot.core import commands, Config, bank
+from redbot.core import commands, Config, bank, data_manager
 from redbot.core.bot import Red
+from redbot.core.errors import BalanceTooHigh
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+from . import simulator
+from .history import DrawHistory
+from .rules import carry_over, per_win
+
 class Lottery(commands.Cog):
+    TICKET_PRICE = 5000
+    MAX_TICKETS = 100  # Per user per draw cycle
+    PAYOUT_CONCURRENCY = 10  # Deposits in flight at once
+    PAYOUT_RETRIES = 3
+    SETTLED = "settled"  # Epoch key holding a drawn epoch's outcome until it is retired
+    MOVED = "moved"      # Escrow key listing epochs whose winnings were added to it
+
     def __init__(self, bot: Red):
         self.bot = bot
+        self.rng = np.random.default_rng()
         self.config = Config.get_conf(self, identifier=1234567890)
         default_guild = {
-            "pool": 0,          # Current prize pool (credits)
-            "tickets": {},       # {user_id: [n1, n2, n3, n4, n5]}
+            "pool": 0,          # Prize pool carried over from previous draws (credits)
+            "tickets": {},       # Legacy single buffer, migrated into "epochs"
+            "epoch": 0,          # Epoch currently accepting tickets
+            "epochs": {},        # {epoch: {user_id: [[n1, n2, n3, n4, n5], ...]}}, or a settled marker
             "channel_id": None,  # Announcement channel ID
             "cycle_minutes": 30, # Default 5 hours (300 minutes)
             "multiplier": 40,     # Default prize pool multiplier
             "next_draw": 0,      # Timestamp of next draw
             "banned_user": None, # ID of banned user
+            "escrow": {},        # {user_id: credits} owed to winners, plus the epochs moved in
         }
         self.config.register_guild(**default_guild)
         self.lottery_task = None
+        self.epochs = {}           # {guild_id: epoch accepting tickets}
+        self.pending_buys = {}     # {(guild_id, epoch): purchases still being written}
+        self.buys_drained = {}     # {(guild_id, epoch): Event set when its last purchase finishes}
+        self.paying = set()        # {(guild_id, user_id)} with an escrowed payout being deposited
+        self.buying = set()        # {(guild_id, user_id)} with a purchase in flight
+        self.settle_locks = {}     # {guild_id: Lock} so settlements apply in order
+        self.settle_tasks = set()
+        self.sim_executor = None   # Created on first simulation
+        self.history = DrawHistory(data_manager.cog_data_path(self) / "history")
         self.bot.loop.create_task(self.initialize_scheduler())
 
     async def initialize_scheduler(self):
         await self.bot.wait_until_ready()
+        await self.recover_sealed_epochs()
         self.lottery_task = self.bot.loop.create_task(self.lottery_scheduler())
 
     def cog_unload(self):
         if self.lottery_task:
             self.lottery_task.cancel()
+        if self.sim_executor:
+            self.sim_executor.shutdown(wait=False, cancel_futures=True)
+
+    def simulation_pool(self) -> ProcessPoolExecutor:
+        """Worker process for simulations, started on first use
+
+        Jobs are pickled by module name, and cogs are imported from a path
+        the bot adds at runtime. Forked workers inherit that path; spawned
+        ones get the cog's parent directory added before running a job.
+        """
+        if self.sim_executor is None:
+            if "fork" in multiprocessing.get_all_start_methods():
+                self.sim_executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("fork")
+                )
+            else:
+                self.sim_executor = ProcessPoolExecutor(
+                    max_workers=1, initializer=site.addsitedir,
+                    initargs=(str(Path(__file__).resolve().parent.parent),)
+                )
+        return self.sim_executor
+
+    async def current_epoch(self, guild: discord.Guild) -> int:
+        """Return the epoch currently accepting tickets for a guild"""
+        if guild.id not in self.epochs:
+            async with self.config.guild(guild).all() as data:
+                # Move tickets from the old single buffer into the current epoch.
+                # Their cost was already added to the carried pool, so take it back out.
+                if data["tickets"]:
+                    epoch_key = str(data["epoch"])
+                    buffer = data["epochs"].setdefault(epoch_key, {})
+                    for user_id in data["tickets"]:
+                        tickets = self.user_tickets(data["tickets"], user_id)
+                        buffer[user_id] = self.user_tickets(buffer, user_id) + tickets
+                        data["pool"] = max(0, data["pool"] - len(tickets) * self.TICKET_PRICE)
+                    data["tickets"] = {}
+                epoch = data["epoch"]
+            # Another caller may have loaded (and advanced) it while we awaited
+            self.epochs.setdefault(guild.id, epoch)
+        return self.epochs[guild.id]
+
+    async def recover_sealed_epochs(self):
+        """Settle epochs that were sealed but not settled before a restart
+
+        Winnings left in escrow, e.g. by a restart partway through paying
+        a draw, are paid out again.
+        """
+        for guild_id, data in (await self.config.all_guilds()).items():
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            if data.get("escrow"):
+                owed = {int(user_id): amount for user_id, amount in data["escrow"].items()
+                        if user_id != self.MOVED}
+                self.bot.loop.create_task(self.dispatch_payouts(guild, owed))
+            current = await self.current_epoch(guild)
+            for epoch_key in data.get("epochs", {}):
+                if int(epoch_key) < current:
+                    self.start_settlement(guild, int(epoch_key))
 
     async def lottery_scheduler(self):
         while True:
@@ -55,30 +147,77 @@ class Lottery(commands.Cog):
             next_draw = time.time() + cycle_minutes * 60
             await self.config.guild(self.bot.guilds[0]).next_draw.set(next_draw)
 
-    @commands.command()
-    @commands.cooldown(1, 1, commands.BucketType.user)
-    async def lottobuy(self, ctx: commands.Context):
-        """Buy a lottery ticket for 5000 credits (1 per draw cycle)"""
-        async with self.config.guild(ctx.guild).all() as data:
-            user_id = str(ctx.author.id)
+    @staticmethod
+    def user_tickets(tickets: Dict[str, list], user_id: str) -> List[List[int]]:
+        """Return a user's tickets as a list of 5-number tickets"""
+        owned = tickets.get(user_id, [])
+        # Older data stored a single flat ticket per user
+        if owned and isinstance(owned[0], int):
+            owned = [owned]
+        return owned
 
-            # Check existing ticket
-            if user_id in data["tickets"]:
-                await ctx.send("You already have a ticket for this draw cycle!")
-                return
+    def quick_pick(self, count: int) -> List[List[int]]:
+        """Generate `count` random tickets with a single RNG call"""
+        return self.rng.integers(0, 10, size=(count, 5)).tolist()
 
-            # Check balance
-            if await bank.get_balance(ctx.author) < 5000:
-                await ctx.send("You need 5000 credits to buy a ticket!")
-                return
-
-            # Deduct credits and add to pool
-            await bank.withdraw_credits(ctx.author, 5000)
-            data["pool"] += 5000
+    @commands.command()
+    @commands.cooldown(1, 1, commands.BucketType.user)
+    async def lottobuy(self, ctx: commands.Context, count: int = 1):
+        """Buy lottery tickets for 5000 credits each
+
+        Use `[p]lottobuy 20` to quick-pick 20 tickets at once.
+        """
+        if count < 1:
+            return await ctx.send("You must buy at least 1 ticket!")
+
+        cost = count * self.TICKET_PRICE
+        user_id = str(ctx.author.id)
+        buyer = (ctx.guild.id, user_id)
+        if buyer in self.buying:
+            return await ctx.send("Your previous purchase is still being processed!")
+
+        self.buying.add(buyer)
+        try:
+            # Pin the epoch before any await so a draw sealing it waits for this purchase
+            epoch = await self.current_epoch(ctx.guild)
+            pin = (ctx.guild.id, epoch)
+            self.pending_buys[pin] = self.pending_buys.get(pin, 0) + 1
+            try:
+                guild_conf = self.config.guild(ctx.guild)
+                owned = self.user_tickets(
+                    {user_id: await guild_conf.get_raw("epochs", str(epoch), user_id, default=[])},
+                    user_id
+                )
 
-            # Generate ticket
-            ticket = [random.randint(0, 9) for _ in range(5)]
-            data["tickets"][user_id] = ticket
+                # Check ticket limit
+                if len(owned) + count > self.MAX_TICKETS:
+                    await ctx.send(
+                        f"You can hold at most {self.MAX_TICKETS} tickets per draw cycle! "
+                        f"You currently have {len(owned)}."
+                    )
+                    return
+
+                # Check balance
+                if await bank.get_balance(ctx.author) < cost:
+                    await ctx.send(f"You need {cost} credits to buy {count} ticket(s)!")
+                    return
+
+                # Deduct credits; the pool grows by TICKET_PRICE per ticket in the epoch
+                await bank.withdraw_credits(ctx.author, cost)
+
+                # Generate tickets and write only this user's slot of the epoch
+                new_tickets = self.quick_pick(count)
+                await guild_conf.set_raw("epochs", str(epoch), user_id, value=owned + new_tickets)
+                total_owned = len(owned) + count
+            finally:
+                self.pending_buys[pin] -= 1
+                if not self.pending_buys[pin]:
+                    del self.pending_buys[pin]
+                    drained = self.buys_drained.pop(pin, None)
+                    if drained:
+                        drained.set()
+        finally:
+            self.buying.discard(buyer)
 
         # Calculate time until next draw
         next_draw = await self.config.guild(ctx.guild).next_draw()
@@ -90,20 +229,30 @@ class Lottery(commands.Cog):
             minutes = int((time_left % 3600) // 60)
             time_str = f"{hours} hours and {minutes} minutes"
 
+        shown = "\n".join(
+            f"`{' '.join(str(n) for n in ticket)}`" for ticket in new_tickets[:10]
+        )
+        if count > 10:
+            shown += f"\n...and {count - 10} more"
+
         await ctx.send(
-            f"Ticket purchased! Your numbers: `{ticket}`\n"
+            f"Purchased {count} ticket(s) for {cost} credits! Your numbers:\n{shown}\n"
+            f"You hold {total_owned} ticket(s) this cycle.\n"
             f"Next draw in approximately {time_str}"
         )
 
     @commands.command()
     async def lottopool(self, ctx: commands.Context):
         """Show current lottery prize pool"""
+        epoch = await self.current_epoch(ctx.guild)
         data = await self.config.guild(ctx.guild).all()
-        base_pool = data["pool"]
+        tickets = data["epochs"].get(str(epoch), {})
+        tickets_sold = sum(len(self.user_tickets(tickets, user_id)) for user_id in tickets)
+
+        base_pool = data["pool"] + tickets_sold * self.TICKET_PRICE
         multiplier = data["multiplier"]
         total_pool = base_pool * multiplier
 
-        tickets = data["tickets"]
         next_draw = data["next_draw"]
         time_left = next_draw - time.time()
 
@@ -118,10 +267,64 @@ class Lottery(commands.Cog):
             f"**Base Pool:** {base_pool} credits\n"
             f"**Multiplier:** {multiplier}x\n"
             f"**Total Prize Pool:** {total_pool} credits\n"
-            f"**Tickets Sold:** {len(tickets)}\n"
+            f"**Tickets Sold:** {tickets_sold}\n"
             f"**Next Draw:** {time_str}"
         )
 
+    @commands.command()
+    @commands.guild_only()
+    async def lottohistory(self, ctx: commands.Context, count: int = 10):
+        """Show the most recent lottery draws"""
+        count = max(1, min(count, 20))
+        history = self.history.scan(ctx.guild.id, recent=count)
+        if not history["draws"]:
+            return await ctx.send("No lottery draws have happened yet!")
+
+        lines = []
+        for record in history["recent"]:
+            digits = " ".join(str(n) for n in record["digits"])
+            lines.append(
+                f"<t:{int(record['time'])}:R> - `{digits}` - "
+                f"{record['tickets']} tickets, {record['winners']} winning - "
+                f"**{record['payout']} credits** paid"
+            )
+
+        embed = discord.Embed(
+            title="📜 Lottery History",
+            description="\n".join(lines),
+            color=discord.Color.gold()
+        )
+        embed.set_footer(
+            text=f"{history['draws']} draws total | "
+                 f"{history['tickets']} tickets | {history['payout']} credits paid"
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.guild_only()
+    async def lottostats(self, ctx: commands.Context):
+        """Show how often each digit has won at each position"""
+        history = self.history.scan(ctx.guild.id, recent=0)
+        if not history["draws"]:
+            return await ctx.send("No lottery draws have happened yet!")
+
+        frequency = history["frequency"]
+        header = "Pos " + " ".join(f"{d:>4}" for d in range(10))
+        rows = [
+            f"{pos + 1:>3} " + " ".join(f"{n:>4}" for n in frequency[pos])
+            for pos in range(5)
+        ]
+        hot = frequency.sum(axis=0)
+        embed = discord.Embed(
+            title="📊 Lottery Digit Frequency",
+            description="```\n" + "\n".join([header] + rows) + "\n```",
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="Hottest Digit", value=str(int(hot.argmax())), inline=True)
+        embed.add_field(name="Coldest Digit", value=str(int(hot.argmin())), inline=True)
+        embed.set_footer(text=f"Across {history['draws']} draws")
+        await ctx.send(embed=embed)
+
     @commands.group()
     @commands.admin_or_permissions(manage_guild=True)
     async def lottoset(self, ctx: commands.Context):
@@ -162,76 +365,285 @@ class Lottery(commands.Cog):
         await self.config.guild(ctx.guild).banned_user.set(None)
         await ctx.send("Win ban has been removed!")
 
+    @lottoset.command()
+    async def simulate(self, ctx: commands.Context, *ticket_counts: int):
+        """Simulate a million draws with the current settings
+
+        Pass the ticket counts you expect per draw, e.g. `[p]lottoset simulate 5 20 50`.
+        Each simulated draw sells one of those counts, picked at random.
+        """
+        if not ticket_counts or min(ticket_counts) < 0:
+            return await ctx.send("Give at least one non-negative ticket count per draw!")
+
+        data = await self.config.guild(ctx.guild).all()
+        job = functools.partial(
+            simulator.simulate,
+            ticket_counts,
+            multiplier=data["multiplier"],
+            ticket_price=self.TICKET_PRICE,
+            cycle_minutes=data["cycle_minutes"],
+            start_pool=data["pool"],
+        )
+        try:
+            async with ctx.typing():
+                stats = await asyncio.get_running_loop().run_in_executor(self.simulation_pool(), job)
+        except BrokenProcessPool:
+            # The worker died; start a fresh one next time
+            self.sim_executor.shutdown(wait=False)
+            self.sim_executor = None
+            return await ctx.send("❌ The simulation worker crashed, please try again.")
+
+        embed = discord.Embed(
+            title="🎲 Lottery Simulation",
+            description=(
+                f"{stats['draws']:,} draws at {data['multiplier']}x, "
+                f"every {data['cycle_minutes']} minutes"
+            ),
+            color=discord.Color.gold()
+        )
+        embed.add_field(
+            name="Payouts",
+            value=(
+                f"**Expected per draw:** {stats['mean_payout']:,.0f} credits\n"
+                f"**Std deviation:** {stats['payout_variance'] ** 0.5:,.0f} credits\n"
+                f"**Ticket income per draw:** {stats['mean_income']:,.0f} credits\n"
+                f"**Return to player:** {stats['return_to_player']:.1%}"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Economy",
+            value=(
+                f"**Credits created per draw:** {stats['inflation_per_draw']:,.0f}\n"
+                f"**Credits created per day:** {stats['inflation_per_day']:,.0f}\n"
+                f"**Pool drift per draw:** {stats['pool_drift_per_draw']:+,.0f} credits\n"
+                f"**Final pool:** {stats['final_pool_mean']:,.0f} ± {stats['final_pool_std']:,.0f}"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Draws",
+            value=(
+                f"**No winners:** {stats['no_win_rate']:.1%}\n"
+                f"**Pool split (>5 wins):** {stats['split_rate']:.1%}"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.guild_only()
+    async def lottoclaim(self, ctx: commands.Context):
+        """Claim lottery winnings that couldn't be paid out at draw time"""
+        amount = await self.release_escrow(ctx.author)
+        if amount is None:
+            return await ctx.send("You have no unclaimed lottery winnings.")
+        if amount == 0:
+            return await ctx.send("Your winnings couldn't be deposited right now. Try again later!")
+        await ctx.send(f"Deposited {amount} credits of unclaimed lottery winnings!")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Pay out escrowed winnings when a winner rejoins"""
+        await self.release_escrow(member)
+
+    async def release_escrow(self, member: discord.Member) -> Optional[int]:
+        """Deposit a member's escrowed winnings
+
+        Returns the amount paid, 0 if the deposit failed or a draw is paying
+        them right now, or None if nothing was owed.
+        """
+        async with self.config.guild(member.guild).escrow() as escrow:
+            amount = escrow.get(str(member.id))
+            if not amount:
+                return None
+            settling = self.settle_locks.get(member.guild.id)
+            if (member.guild.id, member.id) in self.paying or (settling and settling.locked()):
+                return 0
+            try:
+                await bank.deposit_credits(member, amount)
+            except Exception:
+                return 0
+            del escrow[str(member.id)]
+        return amount
+
+    async def resolve_member(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Get a member from cache, falling back to the API"""
+        member = guild.get_member(user_id)
+        if member:
+            return member
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
+
+    async def dispatch_payouts(
+        self, guild: discord.Guild, payouts: Dict[int, int]
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Deposit winnings already recorded in escrow, with bounded parallelism
+
+        Each winner's entry is released as soon as it is paid. Failed
+        deposits are retried with backoff; winners who left the guild, or
+        whose deposit keeps failing, stay in escrow.
+        Returns (paid, escrowed) dicts of {user_id: amount}.
+        """
+        semaphore = asyncio.Semaphore(self.PAYOUT_CONCURRENCY)
+        paid = {}
+        escrowed = {}
+
+        async def pay(user_id: int, amount: int):
+            async with semaphore:
+                for attempt in range(self.PAYOUT_RETRIES):
+                    try:
+                        member = await self.resolve_member(guild, user_id)
+                        if member is None:
+                            break  # Left the guild
+                        await bank.deposit_credits(member, amount)
+                    except BalanceTooHigh:
+                        break  # Retrying won't help
+                    except Exception:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    paid[user_id] = amount
+                    async with self.config.guild(guild).escrow() as escrow:
+                        left = escrow.get(str(user_id), 0) - amount
+                        if left > 0:
+                            escrow[str(user_id)] = left
+                        else:
+                            escrow.pop(str(user_id), None)
+                    return
+            escrowed[user_id] = amount
+
+        # Claim the entries before any await so lottoclaim can't deposit them meanwhile
+        claimed = {}
+        for user_id, amount in payouts.items():
+            if (guild.id, user_id) in self.paying:
+                escrowed[user_id] = amount  # Another payout is depositing it
+            else:
+                claimed[user_id] = amount
+                self.paying.add((guild.id, user_id))
+        try:
+            await asyncio.gather(*(pay(user_id, amount) for user_id, amount in claimed.items()))
+        finally:
+            self.paying.difference_update((guild.id, user_id) for user_id in claimed)
+        return paid, escrowed
+
     async def draw_lottery(self, guild: discord.Guild):
+        """Seal the current ticket epoch and settle it in the background"""
+        epoch = await self.current_epoch(guild)
+        # Swap in a fresh buffer; purchases from here on go to the next draw
+        self.epochs[guild.id] = epoch + 1
+        await self.config.guild(guild).epoch.set(epoch + 1)
+        self.start_settlement(guild, epoch)
+
+    def start_settlement(self, guild: discord.Guild, epoch: int):
+        task = self.bot.loop.create_task(self.settle_epoch(guild, epoch))
+        self.settle_tasks.add(task)
+        task.add_done_callback(self.settle_tasks.discard)
+
+    async def retire_epoch(self, guild: discord.Guild, epoch: int, pool: int, owed: Dict[str, int]):
+        """Apply a settled epoch's marker: carry the pool, escrow its winnings, drop it
+
+        Each key is written on its own so concurrent purchases and the
+        scheduler's writes aren't overwritten. Escrow records the epochs it
+        took winnings from, so resuming after a restart never adds them twice.
+        """
+        guild_conf = self.config.guild(guild)
+        await guild_conf.pool.set(pool)
+        if owed:
+            async with guild_conf.escrow() as escrow:
+                moved = escrow.setdefault(self.MOVED, [])
+                if epoch not in moved:
+                    for user_id, payout in owed.items():
+                        escrow[user_id] = escrow.get(user_id, 0) + payout
+                    moved.append(epoch)
+        await guild_conf.clear_raw("epochs", str(epoch))
+        if owed:
+            async with guild_conf.escrow() as escrow:
+                moved = escrow.get(self.MOVED, [])
+                if epoch in moved:
+                    moved.remove(epoch)
+                if not moved:
+                    escrow.pop(self.MOVED, None)
+
+    async def settle_epoch(self, guild: discord.Guild, epoch: int):
+        """Draw winning numbers for a sealed epoch and pay out its tickets"""
+        # Let purchases that pinned this epoch finish writing
+        pin = (guild.id, epoch)
+        while self.pending_buys.get(pin):
+            await self.buys_drained.setdefault(pin, asyncio.Event()).wait()
+
+        lock = self.settle_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            await self._settle_epoch(guild, epoch)
+
+    async def _settle_epoch(self, guild: discord.Guild, epoch: int):
         data = await self.config.guild(guild).all()
-        if not data["tickets"]:
-            # Reset timer if no tickets
-            next_draw = time.time() + data["cycle_minutes"] * 60
-            await self.config.guild(guild).next_draw.set(next_draw)
+        tickets = data["epochs"].get(str(epoch), {})
+        if not tickets:
+            await self.config.guild(guild).clear_raw("epochs", str(epoch))
+            return
+        if self.SETTLED in tickets:
+            # Drawn before a restart; finish moving its winnings to escrow
+            settled = tickets[self.SETTLED]
+            await self.retire_epoch(guild, epoch, settled["pool"], settled["payouts"])
+            payouts = {int(user_id): payout for user_id, payout in settled["payouts"].items()}
+            if payouts:
+                await self.dispatch_payouts(guild, payouts)
             return
 
+        tickets_sold = sum(len(self.user_tickets(tickets, user_id)) for user_id in tickets)
+
         # Apply multiplier to prize pool
-        base_pool = data["pool"]
+        base_pool = data["pool"] + tickets_sold * self.TICKET_PRICE
         multiplier = data["multiplier"]
         prize_pool = base_pool * multiplier
 
-        # Generate base winning numbers
-        base_winning_numbers = [random.randint(0, 9) for _ in range(5)]
-        winning_numbers = base_winning_numbers.copy()
+        # Generate winning numbers
+        winning_numbers = [random.randint(0, 9) for _ in range(5)]
 
-        # Check if we need to modify winning numbers for banned user
+        # Check every ticket against the winning numbers; a banned user's
+        # tickets never win, without changing the draw for anyone else
         banned_user_id = data["banned_user"]
-        banned_has_ticket = banned_user_id and str(banned_user_id) in data["tickets"]
-        modified = False
-
-        if banned_has_ticket:
-            banned_ticket = data["tickets"][str(banned_user_id)]
-            # Create a copy to modify
-            winning_numbers = base_winning_numbers.copy()
-
-            # For each position where banned user would win, modify that number
-            for i in range(5):
-                if banned_ticket[i] == winning_numbers[i]:
-                    # Modify this number to prevent win
-                    winning_numbers[i] = (winning_numbers[i] + 1) % 10
-                    modified = True
-
-        # Check all tickets against the final winning numbers
         winners = []  # (user_id, match_count, ticket)
-        for user_id, ticket in data["tickets"].items():
-            matches = sum(1 for i in range(5) if ticket[i] == winning_numbers[i])
-            if matches > 0:
-                winners.append((int(user_id), matches, ticket))
+        for user_id in tickets:
+            if banned_user_id and int(user_id) == banned_user_id:
+                continue
+            for ticket in self.user_tickets(tickets, user_id):
+                matches = sum(1 for i in range(5) if ticket[i] == winning_numbers[i])
+                if matches > 0:
+                    winners.append((int(user_id), matches, ticket))
 
         total_wins = sum(match_count for _, match_count, _ in winners)
 
         # Calculate winnings
         payouts = {}
         if winners:
-            if total_wins <= 5:
-                per_win = int(prize_pool * 0.2)
-                for user_id, match_count, _ in winners:
-                    payout = match_count * per_win
-                    payouts[user_id] = payouts.get(user_id, 0) + payout
-            else:
-                per_win = prize_pool // total_wins
-                for user_id, match_count, _ in winners:
-                    payout = match_count * per_win
-                    payouts[user_id] = payouts.get(user_id, 0) + payout
-
-            # Distribute winnings
-            for user_id, amount in payouts.items():
-                user = guild.get_member(user_id)
-                if user:
-                    await bank.deposit_credits(user, amount)
+            win_amount = per_win(prize_pool, total_wins)
+            for user_id, match_count, _ in winners:
+                payout = match_count * win_amount
+                payouts[user_id] = payouts.get(user_id, 0) + payout
 
         # Calculate leftover
         total_payout = sum(payouts.values())
-        leftover = base_pool - (total_payout // multiplier)  # Revert multiplier for storage
+        leftover = carry_over(base_pool, total_payout, multiplier)
 
-        # Save results
-        await self.config.guild(guild).pool.set(leftover)
-        await self.config.guild(guild).tickets.set({})
+        # Save results; the outcome replaces the epoch's tickets first, so a
+        # restart resumes from it instead of drawing again or losing winnings
+        owed = {str(user_id): payout for user_id, payout in payouts.items()}
+        await self.config.guild(guild).set_raw(
+            "epochs", str(epoch), value={self.SETTLED: {"pool": leftover, "payouts": owed}}
+        )
+        await self.retire_epoch(guild, epoch, leftover, owed)
+        self.history.append(
+            guild.id, time.time(), winning_numbers, tickets_sold,
+            len(winners), prize_pool, total_payout
+        )
+
+        # Distribute winnings
+        escrowed = {}
+        if payouts:
+            paid, escrowed = await self.dispatch_payouts(guild, payouts)
 
         # Send announcement
         channel_id = data["channel_id"]
@@ -255,18 +667,29 @@ class Lottery(commands.Cog):
         if not winners:
             result = "No winning tickets! Prize pool carries over to next draw."
         else:
-            result = []
+            # Group winning tickets per user to keep the embed compact
+            summary = {}
             for user_id, match_count, ticket in winners:
+                entry = summary.setdefault(user_id, {"tickets": [], "matches": 0})
+                entry["tickets"].append(ticket)
+                entry["matches"] += match_count
+
+            result = []
+            for user_id, entry in summary.items():
                 user = guild.get_member(user_id)
-                ticket_str = " ".join(str(n) for n in ticket)
-                payout = payouts.get(user_id, 0)
+                if len(entry["tickets"]) == 1:
+                    ticket_str = " ".join(str(n) for n in entry["tickets"][0])
+                    detail = f"`{ticket_str}` ({entry['matches']}/5)"
+                else:
+                    detail = f"{len(entry['tickets'])} tickets ({entry['matches']} matches)"
                 result.append(
                     f"**{user.mention if user else 'Unknown'}** - "
-                    f"`{ticket_str}` ({match_count}/5) - "
-                    f"**{payout} credits**"
+                    f"{detail} - "
+                    f"**{payouts.get(user_id, 0)} credits**"
                 )
             result = "\n".join(result)
-
+            if len(result) > 1024:
+                result = result[:1000].rsplit("\n", 1)[0] + "\n...and more"
         embed.add_field(
             name="Results",
             value=result or "No winners",
@@ -289,6 +712,16 @@ class Lottery(commands.Cog):
                 f"**Carry Over:** {leftover} credits"
             )
         )
+        if escrowed:
+            embed.add_field(
+                name="Held in Escrow",
+                value=(
+                    f"{sum(escrowed.values())} credits for {len(escrowed)} winner(s) "
+                    f"who couldn't be paid. They will receive it when they rejoin "
+                    f"or use `lottoclaim`."
+                ),
+                inline=False
+            )
 
         embed.set_footer(text=footer)
         await channel.send(embed=embed)
@@ -0,0 +1,22 @@
+import numpy as np
+
+# Pure payout rules shared by the cog and the simulator.
+# Every function accepts plain ints or NumPy arrays (one element per draw).
+
+SMALL_WIN_LIMIT = 5     # At or below this many total wins, each win pays a fixed share
+SMALL_WIN_SHARE = 0.2   # Share of the prize pool paid per win in that case
+
+
+def per_win(prize_pool, total_wins):
+    """Credits paid for each matching number in a draw"""
+    prize_pool = np.asarray(prize_pool)
+    total_wins = np.asarray(total_wins)
+    fixed = (prize_pool * SMALL_WIN_SHARE).astype(np.int64)
+    split = prize_pool // np.maximum(total_wins, 1)
+    result = np.where(total_wins <= SMALL_WIN_LIMIT, fixed, split)
+    return result if result.ndim else int(result)
+
+
+def carry_over(base_pool, total_payout, multiplier):
+    """Base pool left for the next draw after paying out"""
+    return base_pool - (total_payout // multiplier)  # Revert multiplier for storage
@@ -0,0 +1,77 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from .rules import carry_over, per_win
+
+# Each ticket has 5 independent digits and matches each winning digit with
+# probability 1/10, so a draw's total wins is Binomial(5 * tickets, 0.1).
+DIGITS = 5
+MATCH_CHANCE = 0.1
+
+
+def simulate(
+    ticket_counts: Sequence[int],
+    multiplier: int,
+    ticket_price: int,
+    cycle_minutes: int,
+    start_pool: int = 0,
+    draws: int = 1_000_000,
+    chains: int = 10_000,
+    seed: Optional[int] = None,
+) -> Dict[str, float]:
+    """Simulate lottery economics for a ticket-count distribution
+
+    Tickets sold per draw are sampled uniformly from `ticket_counts`.
+    `chains` independent lotteries are advanced together one cycle at a time,
+    so each step is vectorized across chains and the carried pool evolves
+    exactly as it does in the cog. Runs in a worker process, so it must
+    stay free of Discord imports.
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.asarray(ticket_counts, dtype=np.int64)
+    chains = max(1, min(chains, draws))
+    cycles = max(1, draws // chains)
+
+    pool = np.full(chains, start_pool, dtype=np.int64)
+    payout_sum = 0.0
+    payout_sq_sum = 0.0
+    income_sum = 0.0
+    split_draws = 0  # Draws where the pool was split (more than 5 wins)
+    empty_draws = 0
+
+    for _ in range(cycles):
+        sold = rng.choice(counts, size=chains)
+        income = sold * ticket_price
+        base_pool = pool + income
+        prize_pool = base_pool * multiplier
+
+        total_wins = rng.binomial(DIGITS * sold, MATCH_CHANCE)
+        total_payout = total_wins * per_win(prize_pool, total_wins)
+        pool = np.where(sold > 0, carry_over(base_pool, total_payout, multiplier), pool)
+
+        payout = total_payout.astype(np.float64)
+        payout_sum += payout.sum()
+        payout_sq_sum += (payout ** 2).sum()
+        income_sum += income.sum()
+        split_draws += int((total_wins > 5).sum())
+        empty_draws += int((total_wins == 0).sum())
+
+    total = chains * cycles
+    mean_payout = payout_sum / total
+    mean_income = income_sum / total
+    draws_per_day = 1440 / cycle_minutes
+
+    return {
+        "draws": total,
+        "mean_payout": mean_payout,
+        "payout_variance": payout_sq_sum / total - mean_payout ** 2,
+        "mean_income": mean_income,
+        "return_to_player": mean_payout / mean_income if mean_income else 0.0,
+        "inflation_per_draw": mean_payout - mean_income,
+        "inflation_per_day": (mean_payout - mean_income) * draws_per_day,
+        "pool_drift_per_draw": float((pool.mean() - start_pool) / cycles),
+        "final_pool_mean": float(pool.mean()),
+        "final_pool_std": float(pool.std()),
+        "split_rate": split_draws / total,
+        "no_win_rate": empty_draws / total,
+    }
@@ -0,0 +1,98 @@
+"""Combat balance report and engine benchmarks
+
+Run from the repo root with `python -m rpg.bench`.
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from . import engine
+from .enemies import DEFAULT_CATALOG
+
+
+class _State:
+    __slots__ = ("enemies", "enemy", "player_health", "enemy_health",
+                 "player_defending", "enemy_defending")
+
+    def __init__(self, player_health, enemy, enemy_health):
+        self.enemies = DEFAULT_CATALOG
+        self.enemy = enemy
+        self.player_health = player_health
+        self.enemy_health = enemy_health
+        self.player_defending = False
+        self.enemy_defending = False
+
+
+def scalar_fight(attack, health, rng, max_turns=200):
+    """One always-attack fight through the per-turn engine, as the cog plays it"""
+    state = _State(health, *DEFAULT_CATALOG.spawn(rng))
+    for turn in range(1, max_turns + 1):
+        engine.player_attack(state, attack, rng)
+        if state.enemy_health <= 0:
+            return True, turn
+        engine.enemy_turn(state, rng)
+        if state.player_health <= 0:
+            return False, turn
+    return False, max_turns
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_throughput(out):
+    out.write("== Throughput ==\n")
+    rng = random.Random(0)
+    fights = 20_000
+    _, elapsed = timed(lambda: [scalar_fight(15, 100, rng) for _ in range(fights)])
+    out.write(f"scalar engine      {fights:>9,} fights  {fights / elapsed:>12,.0f} fights/s\n")
+
+    for fights in (100_000, 1_000_000):
+        _, elapsed = timed(engine.simulate_batch, fights, 15, 100, seed=0)
+        out.write(f"vectorized batch   {fights:>9,} fights  {fights / elapsed:>12,.0f} fights/s\n")
+
+
+def bench_agreement(out):
+    """The batch simulator must agree with the per-turn engine"""
+    out.write("\n== Scalar vs batch agreement ==\n")
+    rng = random.Random(1)
+    results = [scalar_fight(15, 100, rng) for _ in range(50_000)]
+    scalar_rate = sum(won for won, _ in results) / len(results)
+    scalar_turns = sum(turns for _, turns in results) / len(results)
+    batch = engine.simulate_batch(1_000_000, 15, 100, seed=1)
+    out.write(
+        f"win rate   scalar {scalar_rate:.4f}  batch {batch['win_rate']:.4f}\n"
+        f"mean turns scalar {scalar_turns:.3f}  batch {batch['mean_turns']:.3f}\n"
+    )
+
+
+def balance_report(out, fights=1_000_000):
+    out.write("\n== Balance by stat profile ==\n")
+    out.write(f"{'attack':>6} {'health':>6} {'enemy hp':>9} {'win':>7} {'turns':>6} "
+              f"{'p50':>4} {'p90':>4} {'hp lost':>7}\n")
+    for attack in (10, 15, 20, 30):
+        for health in (50, 100, 150):
+            for enemy_hp in ((40, 150), (80, 200)):
+                stats = engine.simulate_batch(fights, attack, health, enemy_hp=enemy_hp, seed=2)
+                cumulative = np.cumsum(stats["turns"]) / fights
+                p50 = int(np.searchsorted(cumulative, 0.5))
+                p90 = int(np.searchsorted(cumulative, 0.9))
+                out.write(
+                    f"{attack:>6} {health:>6} {enemy_hp[0]:>4}-{enemy_hp[1]:<4} "
+                    f"{stats['win_rate']:>7.2%} {stats['mean_turns']:>6.2f} {p50:>4} {p90:>4} "
+                    f"{stats['mean_health_lost_on_win']:>7.1f}\n"
+                )
+
+
+def main(out=sys.stdout):
+    bench_throughput(out)
+    bench_agreement(out)
+    balance_report(out)
+
+
+if __name__ == "__main__":
+    main()
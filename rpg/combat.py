@@ -1,8 +1,24 @@
-from redbot.core import commands, Config, bank
+from redbot.core import commands, Config, bank, data_manager
 from redbot.core.errors import BalanceTooHigh, BankError
 import discord
 from discord.ui import Button, View
+import asyncio
+import itertools
+import logging
 import random
+import time
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+from . import engine
+from .enemies import DEFAULT_CATALOG, load_catalog
+from .leveling import Leaderboard, LevelCurve
+from .matchmaking import MatchQueue, elo_update
+from .session import CombatSession, DuelSession, RaidSession, SessionIndex
+
+log = logging.getLogger("red.rpg")
 
 class CombatGame(commands.Cog):
     """JRPG-style Combat System with Healing"""
@@ -14,16 +30,100 @@ class CombatGame(commands.Cog):
             health=100,
             max_health=100,
             attack=15,
-            defense=5
+            defense=5,
+            xp=0,
+            health_at=0,  # When health was last written; current HP regenerates from here
+            rating=1000  # Duel rating
         )
-        self.active_combats = {}
+        self.config.register_global(leaderboard=None)  # [[user_id, xp], ...] best first
+        self.active_combats = SessionIndex(ttl=120.0)  # Idle fights expire after 2 minutes
         self.reward_amount = 100  # Credits per victory
         self.heal_cost = 50  # Cost to fully heal
+        self.regen_rate = 1 / 60  # HP regenerated per second outside combat
+        self.rng = random.Random()
+        self.edit_window = 1.0  # Seconds of clicks folded into one message edit
+        self.enemy_file = data_manager.cog_data_path(self) / "enemies.json"
+        try:
+            self.enemies = load_catalog(self.enemy_file)
+        except (OSError, ValueError) as e:
+            log.warning("Error loading enemies from %s, using the defaults: %s", self.enemy_file, e)
+            self.enemies = DEFAULT_CATALOG
+        self.levels = LevelCurve()
+        self.leaderboard = Leaderboard(size=25)
+        self.gear = OrderedDict()  # {user_id: (stat bonus, equipped item names)}, most recent last
+        self.gear_cache_size = 5000
+        self.duels = SessionIndex(ttl=120.0)  # Idle duels are forfeited by the player to move
+        self.duelists = {}  # {user_id: DuelSession}
+        self.duel_ids = itertools.count(1)
+        self.queues = {}  # {guild_id: MatchQueue}
+        self.queued = {}  # {user_id: guild_id}, a player waits in one queue at a time
+        self.raids = SessionIndex(ttl=120.0)  # {channel_id: RaidSession}
+        self.raiders = {}  # {user_id: RaidSession}
+        self.raid_capacity = 25
+        self.raid_interval = 2.0  # Seconds between raid ticks
+        self.raid_hp_scale = 2  # Boss HP added per raider, in regular enemy spawns
+        self.np_rng = np.random.default_rng()
+        self.bot.loop.create_task(self.load_leaderboard())
+        self.reaper_task = self.bot.loop.create_task(self.reap_sessions())
+
+    def cog_unload(self):
+        self.reaper_task.cancel()
+        # Nothing expires these sessions once the reaper is gone, so retire their buttons now
+        for session in self.active_combats.values() + self.duels.values():
+            self.stop_session(session)
+        for session in set(self.raiders.values()):
+            self.stop_session(session)
+
+    async def load_leaderboard(self):
+        """Load the saved top players, building the board once if it was never saved"""
+        saved = await self.config.leaderboard()
+        if saved is None:
+            users = await self.config.all_users()
+            saved = [[user_id, data["xp"]] for user_id, data in users.items() if data.get("xp")]
+            self.leaderboard = Leaderboard(self.leaderboard.size, saved)
+            await self.config.leaderboard.set(self.leaderboard.to_list())
+        else:
+            self.leaderboard = Leaderboard(self.leaderboard.size, saved)
+
+    async def reap_sessions(self):
+        """Expire idle fights and disable their buttons"""
+        while True:
+            indexes = (self.active_combats, self.duels, self.raids)
+            expiries = [t for t in (index.next_expiry() for index in indexes) if t is not None]
+            if not expiries:
+                delay = min(index.ttl for index in indexes)
+            else:
+                delay = max(0.0, min(expiries) - time.monotonic())
+            await asyncio.sleep(delay)
+
+            for index, expire in ((self.active_combats, self.expire_session),
+                                  (self.duels, self.expire_duel),
+                                  (self.raids, self.expire_raid)):
+                for session in index.pop_expired():
+                    # One failing session must not stop the reaper
+                    try:
+                        await expire(session)
+                    except Exception:
+                        log.exception("Failed to expire %s %s", type(session).__name__, session.key)
+
+    async def expire_session(self, session):
+        """Close a fight that timed out"""
+        self.stop_session(session)
+        if not session.message:
+            return
+        try:
+            embed = session.message.embeds[0] if session.message.embeds else discord.Embed()
+            embed.description = "⌛ The enemy lost interest and wandered off. Combat ended."
+            await session.message.edit(embed=embed, view=None)
+        except discord.HTTPException:
+            pass
 
     @commands.command()
     @commands.is_owner()
     async def resetplayer(self, ctx, user: discord.User):
         await self.config.user(user).clear()
+        if self.leaderboard.remove(user.id):
+            await self.config.leaderboard.set(self.leaderboard.to_list())
         await ctx.send(f"Reset {user.name}'s data!")
 
     @commands.command()
@@ -31,16 +131,15 @@ class CombatGame(commands.Cog):
         """Restore your health to full for 100 credits"""
         user = ctx.author
 
-        # Ensure user is initialized
-        await self.initialize_user(user)
-
         # Check if user is in combat
         if user.id in self.active_combats:
             return await ctx.send("You can't heal while in combat!")
 
-        # Get player stats
-        health = await self.config.user(user).health()
-        max_health = await self.config.user(user).max_health()
+        # Get player stats in one read
+        profile = await self.load_profile(user)
+        bonus, _ = await self.equipment(user)
+        max_health = self.levels.stats(profile, bonus)["max_health"]
+        health = self.current_health(profile, max_health)
 
         # Check if already at full health
         if health >= max_health:
@@ -61,6 +160,7 @@ class CombatGame(commands.Cog):
 
             # Restore health
             await self.config.user(user).health.set(max_health)
+            await self.config.user(user).health_at.set(time.time())
 
             # Get currency name for display
             currency_name = await bank.get_currency_name(ctx.guild)
@@ -82,14 +182,100 @@ class CombatGame(commands.Cog):
         except Exception as e:
             await ctx.send(f"An error occurred: {str(e)}")
 
-    async def initialize_user(self, user):
-        """Ensure user has initial stats"""
-        async with self.config.user(user).all() as user_data:
-            if user_data["health"] == 0:  # If new user
-                user_data["health"] = 100
-                user_data["max_health"] = 100
-                user_data["attack"] = 15
-                user_data["defense"] = 5
+    async def equipment(self, user):
+        """Stat bonus and names of the user's equipped shop items, cached until their inventory changes
+
+        The best owned item in each slot is equipped automatically.
+        """
+        cached = self.gear.get(user.id)
+        if cached is not None:
+            self.gear.move_to_end(user.id)
+            return cached
+
+        best = {}  # {slot: (total bonus, item name, stats)}
+        shop = self.bot.get_cog("ShopSystem")
+        if shop:
+            await shop.ensure_ready()
+            for item_id in set(await shop.config.user(user).inventory()):
+                item = shop.shop_items.get(item_id, {})
+                item_stats = item.get("stats")
+                if not item_stats:
+                    continue
+                slot = item.get("slot", item_id)
+                total = sum(item_stats.values())
+                if slot not in best or total > best[slot][0]:
+                    best[slot] = (total, item.get("name", item_id), item_stats)
+
+        bonus = {}
+        for _, _, item_stats in best.values():
+            for stat, value in item_stats.items():
+                bonus[stat] = bonus.get(stat, 0) + value
+        cached = (bonus, [name for _, name, _ in best.values()])
+
+        self.gear[user.id] = cached
+        if len(self.gear) > self.gear_cache_size:
+            self.gear.popitem(last=False)
+        return cached
+
+    @commands.Cog.listener()
+    async def on_shop_inventory_change(self, user):
+        """Recompute equipment the next time this user's stats are needed"""
+        self.gear.pop(user.id, None)
+
+    @commands.Cog.listener()
+    async def on_shop_items_change(self):
+        self.gear.clear()
+
+    async def load_profile(self, user):
+        """Read a user's stats in one Config call, initializing new users"""
+        profile = await self.config.user(user).all()
+        if profile["health"] == 0:  # If new user
+            profile.update(health=100, max_health=100, attack=15, defense=5, health_at=time.time())
+            await self.config.user(user).set(profile)
+        elif not profile["health_at"]:
+            # Stored before regeneration existed; it starts counting from now
+            profile["health_at"] = time.time()
+            await self.config.user(user).health_at.set(profile["health_at"])
+        return profile
+
+    def current_health(self, profile, max_health):
+        """Stored health plus passive regeneration since it was written"""
+        return engine.regenerated_health(
+            profile["health"], max_health, profile["health_at"], time.time(), self.regen_rate
+        )
+
+    async def save_profile(self, user, session):
+        """Write back only the stats that changed during a fight
+
+        Health is also written when it regenerated before the fight, so that
+        regeneration isn't credited again from the old timestamp.
+        """
+        user_conf = self.config.user(user)
+        stored = session.profile["health"]
+        if session.player_health != stored or session.start_health != stored:
+            now = time.time()
+            await user_conf.health.set(session.player_health)
+            await user_conf.health_at.set(now)
+            session.profile["health"] = session.start_health = session.player_health
+            session.profile["health_at"] = now
+        if session.xp != session.profile["xp"]:
+            await user_conf.xp.set(session.xp)
+            session.profile["xp"] = session.xp
+            if self.leaderboard.update(user.id, session.xp):
+                await self.config.leaderboard.set(self.leaderboard.to_list())
+
+    def in_fight(self, user_id):
+        return user_id in self.active_combats or user_id in self.duelists or user_id in self.raiders
+
+    def leave_queue(self, user_id):
+        guild_id = self.queued.pop(user_id, None)
+        if guild_id is None:
+            return False
+        queue = self.queues[guild_id]
+        queue.remove(user_id)
+        if not queue:
+            del self.queues[guild_id]
+        return True
 
     @commands.command()
     async def combat(self, ctx):
@@ -97,64 +283,64 @@ class CombatGame(commands.Cog):
         user = ctx.author
         user_id = user.id
 
-        # Ensure user is initialized
-        await self.initialize_user(user)
-
         # Check if user already in combat
-        if user_id in self.active_combats:
+        if self.in_fight(user_id):
             return await ctx.send("You're already in combat!")
+        self.leave_queue(user_id)
 
-        # Get player health from config
-        player_health = await self.config.user(user).health()
+        # Snapshot the player's stats for the whole fight
+        profile = await self.load_profile(user)
+        bonus, _ = await self.equipment(user)
+        currency_name = await bank.get_currency_name(None) if await bank.is_global() else None
+        if self.in_fight(user_id):
+            return await ctx.send("You're already in combat!")
 
         # Initialize combat
-        combat_data = {
-            "player_health": player_health,
-            "enemy_health": random.randint(40, 150),
-            "player_defending": False,
-            "enemy_defending": False,
-            "message": None
-        }
-        self.active_combats[user_id] = combat_data
+        enemy, enemy_health = self.enemies.spawn(self.rng)
+        session = CombatSession(user_id, profile, self.enemies, enemy, enemy_health)
+        session.stats = self.levels.stats(profile, bonus)
+        session.player_health = self.current_health(profile, session.stats["max_health"])
+        session.start_health = session.player_health
+        session.currency_name = currency_name
+        self.active_combats.add(session)
 
         # Create combat interface
-        embed = await self.create_combat_embed(user, combat_data)
-        view = self.create_combat_view()
-        combat_data["message"] = await ctx.send(embed=embed, view=view)
+        embed = self.create_combat_embed(user, session)
+        session.view = self.create_combat_view()
+        session.message = await ctx.send(embed=embed, view=session.view)
 
-    async def create_combat_embed(self, user, combat_data):
+    def create_combat_embed(self, user, session):
         """Create embed for combat"""
-        max_health = await self.config.user(user).max_health()
+        max_health = session.stats["max_health"]
 
         embed = discord.Embed(
-            title=f"⚔️ {user.display_name}'s Battle",
+            title=f"⚔️ {user.display_name}'s Battle (Lv. {session.stats['level']})",
             color=0xff0000
         )
         embed.add_field(
             name="Your Health",
-            value=f"❤️ {combat_data['player_health']}/{max_health}",
+            value=f"❤️ {session.player_health}/{max_health}",
             inline=True
         )
 
         # Show enemy status with defense icon if defending
         enemy_status = "💀"
-        if combat_data["enemy_defending"]:
+        if session.enemy_defending:
             enemy_status = "🛡️"
         embed.add_field(
-            name="Enemy Health",
-            value=f"{enemy_status} {combat_data['enemy_health']}",
+            name=session.enemies.names[session.enemy],
+            value=f"{enemy_status} {session.enemy_health}/{session.enemy_max_health}",
             inline=True
         )
 
         # Show reward info if available
-        if await bank.is_global():
-            currency_name = await bank.get_currency_name(ctx.guild)
-            embed.set_footer(text=f"Reward: {self.reward_amount} {currency_name} per victory")
+        if session.currency_name:
+            embed.set_footer(text=f"Reward: {self.reward_amount} {session.currency_name} per victory")
         return embed
 
     def create_combat_view(self):
         """Create button view"""
-        view = View(timeout=60.0)
+        view = View(timeout=None)  # Expiry is handled by reap_sessions
 
         # Attack Button
         attack_btn = Button(style=discord.ButtonStyle.danger, label="⚔️ Attack")
@@ -168,25 +354,14 @@ class CombatGame(commands.Cog):
 
         return view
 
-    async def enemy_turn(self, user, combat_data):
+    def enemy_turn(self, user, session):
         """Enemy AI: Randomly choose to attack or defend"""
-        # 70% chance to attack, 30% chance to defend
-        if random.random() < 0.7:
-            # Enemy attacks
-            enemy_damage = random.randint(8, 12)
-
-            # Reduce damage if player is defending
-            if combat_data["player_defending"]:
-                enemy_damage = max(1, enemy_damage // 2)  # At least 1 damage
-                combat_data["player_defending"] = False  # Reset defense
-                return f"The enemy attacks! You block for **{enemy_damage}** reduced damage!"
-            else:
-                combat_data["player_health"] = max(0, combat_data["player_health"] - enemy_damage)
-                return f"The enemy attacks for **{enemy_damage}** damage!"
-        else:
-            # Enemy defends
-            combat_data["enemy_defending"] = True
-            return "The enemy assumes a defensive stance! 🛡️"
+        action, enemy_damage = engine.enemy_turn(session, self.rng, session.stats["defense"])
+        if action == "block":
+            return f"The enemy attacks! You block for **{enemy_damage}** reduced damage!"
+        if action == "attack":
+            return f"The enemy attacks for **{enemy_damage}** damage!"
+        return "The enemy assumes a defensive stance! 🛡️"
 
     async def award_victory_rewards(self, user, embed):
         """Award credits to user after victory"""
@@ -219,84 +394,580 @@ class CombatGame(commands.Cog):
         user = interaction.user
         user_id = user.id
 
-        if user_id not in self.active_combats:
+        session = self.active_combats.get(user_id)
+        if session is None:
             await interaction.response.send_message("No active combat!", ephemeral=True)
             return
-
-        combat_data = self.active_combats[user_id]
+        self.active_combats.touch(session)
 
         # Player attack
-        player_attack = await self.config.user(user).attack()
-        base_damage = random.randint(player_attack - 5, player_attack + 5)
-
-        # Reduce damage if enemy is defending
-        if combat_data["enemy_defending"]:
-            damage = max(1, base_damage // 2)  # At least 1 damage
-            combat_data["enemy_defending"] = False  # Reset defense
-            damage_msg = f"You attack for **{damage}** reduced damage! (Enemy defended)"
+        damage, reduced = engine.player_attack(session, session.stats["attack"], self.rng)
+        if reduced:
+            session.log.append(f"You attack for **{damage}** reduced damage! (Enemy defended)")
         else:
-            damage = base_damage
-            damage_msg = f"You attack for **{damage}** damage!"
-
-        combat_data["enemy_health"] = max(0, combat_data["enemy_health"] - damage)
-        combat_data["player_defending"] = False  # Player wasn't defending this turn
+            session.log.append(f"You attack for **{damage}** damage!")
 
         # Enemy turn if still alive
-        enemy_msg = ""
-        if combat_data["enemy_health"] > 0:
-            enemy_msg = await self.enemy_turn(user, combat_data)
+        if session.enemy_health > 0:
+            session.log.append(self.enemy_turn(user, session))
 
-        # Update embed
-        embed = await self.create_combat_embed(user, combat_data)
-        embed.description = f"{damage_msg}\n{enemy_msg}"
+        await self.after_turn(interaction, user, session)
 
-        # Check combat outcome
-        if combat_data["player_health"] <= 0:
-            embed.description += "\n\n**You were defeated!**"
-            await interaction.response.edit_message(embed=embed, view=None)
-            del self.active_combats[user_id]
+    async def defend_handler(self, interaction):
+        user = interaction.user
+        user_id = user.id
+
+        session = self.active_combats.get(user_id)
+        if session is None:
+            await interaction.response.send_message("No active combat!", ephemeral=True)
             return
+        self.active_combats.touch(session)
+        engine.player_defend(session)
+        session.log.append("You assume a defensive stance! 🛡️")
 
-        if combat_data["enemy_health"] <= 0:
+        # Enemy turn
+        session.log.append(self.enemy_turn(user, session))
+
+        await self.after_turn(interaction, user, session)
+
+    async def after_turn(self, interaction, user, session):
+        """Acknowledge the click and schedule the UI update for a resolved turn"""
+        # Check combat outcome before awaiting so later clicks see the fight is over
+        finished = session.player_health <= 0 or session.enemy_health <= 0
+        if finished:
+            self.end_session(session)
+
+        await interaction.response.defer()
+
+        if finished:
+            await self.finish_fight(user, session)
+        elif session.render_task is None:
+            make_embed = partial(self.create_combat_embed, user, session)
+            session.render_task = self.bot.loop.create_task(self.render_later(session, make_embed))
+
+    async def render_later(self, session, make_embed):
+        """Send one edit with the latest state for all turns in the edit window"""
+        await asyncio.sleep(self.edit_window)
+        session.render_task = None
+        embed = make_embed()
+        embed.description = "\n".join(session.log)
+        session.log.clear()
+        try:
+            await session.message.edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+    async def finish_fight(self, user, session):
+        """Show the final result of a fight and pay out on victory"""
+        embed = self.create_combat_embed(user, session)
+        embed.description = "\n".join(session.log)
+
+        if session.player_health <= 0:
+            embed.description += "\n\n**You were defeated!**"
+        else:
             embed.description += "\n\n**You defeated the enemy!**"
-            await self.config.user(user).health.set(combat_data["player_health"])
+
+            # Award XP
+            gained = self.xp_reward(session)
+            session.xp += gained
+            embed.description += f"\n✨ +{gained} XP"
+            new_level = self.levels.level(session.xp)
+            if new_level > session.stats["level"]:
+                embed.description += f"\n🎉 **Level up!** You are now level {new_level}!"
+            await self.save_profile(user, session)
 
             # Award victory rewards
             await self.award_victory_rewards(user, embed)
 
-            await interaction.response.edit_message(embed=embed, view=None)
-            del self.active_combats[user_id]
+        try:
+            await session.message.edit(embed=embed, view=None)
+        except discord.HTTPException:
+            pass
+
+    def xp_reward(self, session):
+        """XP for beating an enemy, scaled by how tough it was"""
+        return 10 + session.enemy_max_health // 5
+
+    @commands.group()
+    @commands.guild_only()
+    async def duel(self, ctx):
+        """Ranked PvP duels"""
+        pass
+
+    @duel.command(name="join")
+    async def duel_join(self, ctx):
+        """Queue for a ranked duel against a player of similar rating"""
+        user_id = ctx.author.id
+        if self.in_fight(user_id):
+            return await ctx.send("You're already in combat!")
+        if user_id in self.queued:
+            return await ctx.send("You're already waiting for a duel!")
+
+        rating = await self.config.user(ctx.author).rating()
+        if self.in_fight(user_id) or user_id in self.queued:
             return
 
-        await interaction.response.edit_message(embed=embed)
+        queue = self.queues.setdefault(ctx.guild.id, MatchQueue())
+        while True:
+            match = queue.match(rating)
+            if match is None:
+                queue.add(user_id, rating)
+                self.queued[user_id] = ctx.guild.id
+                return await ctx.send(
+                    f"🔍 You joined the duel queue (rating {rating}). Waiting for an opponent..."
+                )
+            opponent_id, _ = match
+            del self.queued[opponent_id]
+            opponent = ctx.guild.get_member(opponent_id)
+            if opponent is not None:
+                break
+
+        await self.start_duel(ctx, [opponent, ctx.author])
+
+    @duel.command(name="leave")
+    async def duel_leave(self, ctx):
+        """Leave the duel queue"""
+        if self.leave_queue(ctx.author.id):
+            await ctx.send("You left the duel queue.")
+        else:
+            await ctx.send("You're not waiting for a duel!")
+
+    @duel.command(name="rating")
+    async def duel_rating(self, ctx, user: discord.User = None):
+        """Show a player's duel rating"""
+        user = user or ctx.author
+        rating = await self.config.user(user).rating()
+        await ctx.send(f"⚔️ {user.display_name}'s duel rating: **{rating}**")
+
+    async def start_duel(self, ctx, members):
+        """Open a duel between two matched members"""
+        # Register both fighters before awaiting so neither can start another fight
+        session = DuelSession(next(self.duel_ids), [m.id for m in members], self.rng.randrange(2))
+        for member in members:
+            self.duelists[member.id] = session
+        self.duels.add(session)
+
+        for side, member in enumerate(members):
+            profile = await self.load_profile(member)
+            bonus, _ = await self.equipment(member)
+            session.stats[side] = self.levels.stats(profile, bonus)
+            session.ratings[side] = profile["rating"]
+            session.health[side] = session.stats[side]["max_health"]  # Duels start at full health
+
+        session.view = self.create_duel_view()
+        session.message = await ctx.send(
+            f"{members[0].mention} ⚔️ {members[1].mention}",
+            embed=self.create_duel_embed(session),
+            view=session.view
+        )
+
+    def create_duel_embed(self, session):
+        """Create embed for a duel"""
+        embed = discord.Embed(title="⚔️ Ranked Duel", color=0xff0000)
+        for side, user_id in enumerate(session.players):
+            user = self.bot.get_user(user_id)
+            name = user.display_name if user else str(user_id)
+            stats = session.stats[side]
+            status = "🛡️" if session.defending[side] else "❤️"
+            embed.add_field(
+                name=f"{name} (Lv. {stats['level']}, {session.ratings[side]})",
+                value=f"{status} {session.health[side]}/{stats['max_health']}",
+                inline=True
+            )
 
-    async def defend_handler(self, interaction):
-        user = interaction.user
-        user_id = user.id
+        to_move = self.bot.get_user(session.players[session.turn])
+        embed.set_footer(text=f"{to_move.display_name if to_move else 'Unknown'}'s turn")
+        return embed
 
-        if user_id not in self.active_combats:
-            await interaction.response.send_message("No active combat!", ephemeral=True)
+    def create_duel_view(self):
+        """Create button view shared by both duelists"""
+        view = View(timeout=None)  # Expiry is handled by reap_sessions
+
+        attack_btn = Button(style=discord.ButtonStyle.danger, label="⚔️ Attack")
+        attack_btn.callback = self.duel_attack_handler
+        view.add_item(attack_btn)
+
+        defend_btn = Button(style=discord.ButtonStyle.primary, label="🛡️ Defend")
+        defend_btn.callback = self.duel_defend_handler
+        view.add_item(defend_btn)
+
+        return view
+
+    async def duel_session_for(self, interaction):
+        """The duel this click belongs to, if it's the clicking player's move"""
+        session = self.duelists.get(interaction.user.id)
+        if session is None or session.message is None or session.message.id != interaction.message.id:
+            await interaction.response.send_message("You're not in this duel!", ephemeral=True)
+            return None
+        if session.players[session.turn] != interaction.user.id:
+            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+            return None
+        self.duels.touch(session)
+        return session
+
+    async def duel_attack_handler(self, interaction):
+        session = await self.duel_session_for(interaction)
+        if session is None:
             return
 
-        combat_data = self.active_combats[user_id]
-        combat_data["player_defending"] = True
-        combat_data["enemy_defending"] = False  # Reset enemy defense
+        side = session.turn
+        damage, reduced = engine.duel_attack(
+            session, side, session.stats[side]["attack"], session.stats[1 - side]["defense"], self.rng
+        )
+        name = interaction.user.display_name
+        if reduced:
+            session.log.append(f"{name} attacks for **{damage}** reduced damage! (Blocked)")
+        else:
+            session.log.append(f"{name} attacks for **{damage}** damage!")
 
-        # Enemy turn
-        enemy_msg = await self.enemy_turn(user, combat_data)
+        await self.after_duel_turn(interaction, session)
 
-        # Update embed
-        embed = await self.create_combat_embed(user, combat_data)
-        embed.description = f"You assume a defensive stance! 🛡️\n{enemy_msg}"
+    async def duel_defend_handler(self, interaction):
+        session = await self.duel_session_for(interaction)
+        if session is None:
+            return
 
-        # Check combat outcome
-        if combat_data["player_health"] <= 0:
-            embed.description += "\n\n**You were defeated!**"
-            await interaction.response.edit_message(embed=embed, view=None)
-            del self.active_combats[user_id]
+        engine.duel_defend(session, session.turn)
+        session.log.append(f"{interaction.user.display_name} assumes a defensive stance! 🛡️")
+
+        await self.after_duel_turn(interaction, session)
+
+    async def after_duel_turn(self, interaction, session):
+        """Pass the move to the other side and schedule the UI update"""
+        winner = session.turn if session.health[1 - session.turn] <= 0 else None
+        session.turn = 1 - session.turn
+        if winner is not None:
+            self.end_duel(session)
+
+        await interaction.response.defer()
+
+        if winner is not None:
+            await self.finish_duel(session, winner)
+        elif session.render_task is None:
+            make_embed = partial(self.create_duel_embed, session)
+            session.render_task = self.bot.loop.create_task(self.render_later(session, make_embed))
+
+    async def finish_duel(self, session, winner, forfeit=False):
+        """Show the result of a duel and update both ratings"""
+        loser = 1 - winner
+        new_ratings = [0, 0]
+        new_ratings[winner], new_ratings[loser] = elo_update(session.ratings[winner], session.ratings[loser])
+
+        embed = self.create_duel_embed(session)
+        embed.description = "\n".join(session.log)
+        winner_user = self.bot.get_user(session.players[winner])
+        loser_user = self.bot.get_user(session.players[loser])
+        winner_name = winner_user.display_name if winner_user else str(session.players[winner])
+        loser_name = loser_user.display_name if loser_user else str(session.players[loser])
+        if forfeit:
+            embed.description += f"\n\n⌛ {loser_name} took too long and forfeits!"
+        embed.description += f"\n\n🏆 **{winner_name} wins the duel!**"
+        for side, name in ((winner, winner_name), (loser, loser_name)):
+            embed.description += f"\n{name}: {session.ratings[side]} → {new_ratings[side]}"
+            await self.config.user_from_id(session.players[side]).rating.set(new_ratings[side])
+        embed.set_footer(text="Duel over")
+
+        try:
+            await session.message.edit(embed=embed, view=None)
+        except discord.HTTPException:
+            pass
+
+    async def expire_duel(self, session):
+        """The player to move forfeits a duel that timed out"""
+        self.end_duel(session)
+        if session.message:
+            await self.finish_duel(session, 1 - session.turn, forfeit=True)
+
+    def end_duel(self, session):
+        """Remove a finished duel"""
+        self.duels.pop(session.key)
+        for user_id in session.players:
+            if self.duelists.get(user_id) is session:
+                del self.duelists[user_id]
+        self.stop_session(session)
+
+    @commands.command()
+    @commands.guild_only()
+    async def raid(self, ctx):
+        """Start a raid boss that up to 25 players can fight together"""
+        if ctx.channel.id in self.raids:
+            return await ctx.send("There's already a raid in this channel!")
+        if self.in_fight(ctx.author.id):
+            return await ctx.send("You're already in combat!")
+
+        enemy, _ = self.enemies.spawn(self.rng)
+        session = RaidSession(ctx.channel.id, self.raid_capacity, self.enemies, enemy)
+        self.raids.add(session)
+        self.raiders[ctx.author.id] = session
+        await self.add_raider(session, ctx.author)
+
+        session.view = self.create_raid_view()
+        session.message = await ctx.send(embed=self.create_raid_embed(session), view=session.view)
+        session.dirty = False
+        session.render_task = self.bot.loop.create_task(self.run_raid(session))
+
+    async def add_raider(self, session, member):
+        """Fill a reserved raider's slot and make the boss tougher to match"""
+        self.leave_queue(member.id)
+        profile = await self.load_profile(member)
+        bonus, _ = await self.equipment(member)
+        session.add_player(member.id, self.levels.stats(profile, bonus))  # Raids start at full health
+
+        _, boss_health = self.enemies.spawn(self.rng)
+        boss_health *= self.raid_hp_scale
+        session.boss_health += boss_health
+        session.boss_max_health += boss_health
+
+    def create_raid_embed(self, session):
+        """Create embed for a raid"""
+        guild = session.message.guild if session.message else None
+        embed = discord.Embed(
+            title=f"🐉 Raid: {session.enemies.names[session.enemy]}",
+            description="\n".join(session.log) or "Press **Join** to fight the boss together!",
+            color=0x8b0000
+        )
+        boss_status = "🛡️" if session.boss_defending else "💀"
+        embed.add_field(
+            name="Boss",
+            value=f"{boss_status} {session.boss_health}/{session.boss_max_health}",
+            inline=False
+        )
+
+        lines = []
+        for slot, user_id in enumerate(session.players):
+            member = guild.get_member(user_id) if guild else self.bot.get_user(user_id)
+            name = member.display_name[:16] if member else str(user_id)
+            status = "🛡️" if session.defending[slot] else ("❤️" if session.health[slot] > 0 else "💀")
+            lines.append(f"{status} {name} {session.health[slot]}/{session.max_health[slot]}")
+        embed.add_field(
+            name=f"Raiders ({session.size}/{session.capacity})",
+            value="\n".join(lines) or "None",
+            inline=False
+        )
+        return embed
+
+    def create_raid_view(self):
+        """Create button view shared by all raiders"""
+        view = View(timeout=None)  # Expiry is handled by reap_sessions
+
+        join_btn = Button(style=discord.ButtonStyle.success, label="➕ Join")
+        join_btn.callback = self.raid_join_handler
+        view.add_item(join_btn)
+
+        attack_btn = Button(style=discord.ButtonStyle.danger, label="⚔️ Attack")
+        attack_btn.callback = partial(self.raid_action_handler, engine.RAID_ATTACK)
+        view.add_item(attack_btn)
+
+        defend_btn = Button(style=discord.ButtonStyle.primary, label="🛡️ Defend")
+        defend_btn.callback = partial(self.raid_action_handler, engine.RAID_DEFEND)
+        view.add_item(defend_btn)
+
+        return view
+
+    async def raid_join_handler(self, interaction):
+        session = self.raids.get(interaction.channel_id)
+        user = interaction.user
+        if session is None or session.message is None or session.message.id != interaction.message.id:
+            return await interaction.response.send_message("This raid is over!", ephemeral=True)
+        if user.id in session.slots or self.raiders.get(user.id) is session:
+            return await interaction.response.send_message("You're already in this raid!", ephemeral=True)
+        if self.in_fight(user.id):
+            return await interaction.response.send_message("You're already in combat!", ephemeral=True)
+        if session.size + session.joining >= session.capacity:
+            return await interaction.response.send_message("This raid is full!", ephemeral=True)
+
+        # Reserve the place before awaiting so the raid can't overfill
+        self.raiders[user.id] = session
+        session.joining += 1
+        self.raids.touch(session)
+        try:
+            await interaction.response.defer()
+            await self.add_raider(session, user)
+        finally:
+            session.joining -= 1
+            if self.raids.get(session.key) is not session:  # Ended while joining
+                self.raiders.pop(user.id, None)
+
+    async def raid_action_handler(self, action, interaction):
+        """Queue a raider's action for the next tick"""
+        session = self.raiders.get(interaction.user.id)
+        slot = session.slots.get(interaction.user.id) if session else None
+        if slot is None or session.message is None or session.message.id != interaction.message.id:
+            return await interaction.response.send_message("You're not in this raid!", ephemeral=True)
+        if session.health[slot] <= 0:
+            return await interaction.response.send_message("You've been knocked out!", ephemeral=True)
+
+        session.actions[slot] = action  # Latest press before the tick wins
+        self.raids.touch(session)
+        await interaction.response.defer()
+
+    async def run_raid(self, session):
+        """Apply each tick's queued actions in one batch and send one edit per tick"""
+        while True:
+            await asyncio.sleep(self.raid_interval)
+            if not session.actions.any():
+                if session.dirty:
+                    session.dirty = False
+                    await self.edit_raid(session, self.create_raid_embed(session))
+                continue
+
+            attackers = np.flatnonzero(session.actions == engine.RAID_ATTACK)
+            defenders = np.flatnonzero(session.actions == engine.RAID_DEFEND)
+            session.actions[:] = engine.NO_ACTION
+            result = engine.raid_tick(session, attackers, defenders, self.np_rng)
+            session.log.append(self.describe_raid_tick(session, result))
+
+            if session.boss_health <= 0 or not (session.health[:session.size] > 0).any():
+                session.render_task = None  # Don't cancel this task while it finishes
+                self.end_raid(session)
+                return await self.finish_raid(session)
+
+            session.dirty = False
+            await self.edit_raid(session, self.create_raid_embed(session))
+
+    def describe_raid_tick(self, session, result):
+        """One log line summarising a tick"""
+        parts = []
+        if result["attacks"]:
+            reduced = " (Boss defended)" if result["reduced"] else ""
+            parts.append(f"⚔️ {result['attacks']} attack(s) for **{result['damage']}** damage{reduced}")
+        if result["defends"]:
+            parts.append(f"🛡️ {result['defends']} bracing")
+        if result["boss"] == "defend":
+            parts.append("The boss assumes a defensive stance! 🛡️")
+        elif result["boss"] == "attack":
+            guild = session.message.guild
+            hits = []
+            for slot, damage, blocked in result["hits"]:
+                member = guild.get_member(session.players[slot])
+                name = member.display_name if member else "someone"
+                hits.append(f"{name} **{damage}**{' (blocked)' if blocked else ''}")
+            parts.append("The boss strikes " + ", ".join(hits))
+        return " · ".join(parts)
+
+    async def edit_raid(self, session, embed, view=discord.utils.MISSING):
+        try:
+            await session.message.edit(embed=embed, view=view)
+        except discord.HTTPException:
+            pass
+
+    async def finish_raid(self, session):
+        """Show the result of a raid and reward everyone who dealt damage"""
+        embed = self.create_raid_embed(session)
+        if session.boss_health > 0:
+            embed.description += "\n\n**The raid was wiped out!**"
+            return await self.edit_raid(session, embed, view=None)
+
+        embed.description += "\n\n**The boss has been defeated!**"
+        guild = session.message.guild
+        currency_name = await bank.get_currency_name(guild)
+        ranking = sorted(range(session.size), key=lambda slot: -session.damage_dealt[slot])
+        lines = []
+        board_changed = False
+        for slot in ranking:
+            dealt = int(session.damage_dealt[slot])
+            member = guild.get_member(session.players[slot])
+            if not dealt or member is None:
+                continue
+
+            gained = 10 + dealt // 5
+            xp = await self.config.user(member).xp() + gained
+            await self.config.user(member).xp.set(xp)
+            board_changed |= self.leaderboard.update(member.id, xp)
+            line = f"{member.display_name}: {dealt} damage, +{gained} XP"
+            try:
+                await bank.deposit_credits(member, self.reward_amount)
+            except BalanceTooHigh:
+                await bank.set_balance(member, await bank.get_max_balance(member))
+                line += f" (max {currency_name})"
+            except Exception as e:
+                line += f" (⚠️ reward failed: {e})"
+            lines.append(line)
+        if board_changed:
+            await self.config.leaderboard.set(self.leaderboard.to_list())
+
+        embed.add_field(
+            name=f"🏆 Rewards ({self.reward_amount} {currency_name} each)",
+            value="\n".join(lines[:25]) or "Nobody",
+            inline=False
+        )
+        await self.edit_raid(session, embed, view=None)
+
+    async def expire_raid(self, session):
+        """Close a raid nobody is playing any more"""
+        self.end_raid(session)
+        if not session.message:
             return
+        embed = self.create_raid_embed(session)
+        embed.description = "⌛ The boss lost interest and wandered off. Raid ended."
+        await self.edit_raid(session, embed, view=None)
+
+    def end_raid(self, session):
+        """Remove a finished raid"""
+        self.raids.pop(session.key)
+        for user_id in session.players:
+            if self.raiders.get(user_id) is session:
+                del self.raiders[user_id]
+        self.stop_session(session)
 
-        await interaction.response.edit_message(embed=embed)
+    @commands.command()
+    async def combatprofile(self, ctx, user: discord.User = None):
+        """Show combat level, XP and stats"""
+        user = user or ctx.author
+        profile = await self.config.user(user).all()
+        bonus, equipped = await self.equipment(user)
+        stats = self.levels.stats(profile, bonus)
+        health = self.current_health(profile, stats["max_health"])
+        next_xp = self.levels.next_threshold(stats["level"])
+
+        embed = discord.Embed(title=f"📜 {user.display_name}'s Profile", color=0xff0000)
+        embed.add_field(name="Level", value=str(stats["level"]), inline=True)
+        embed.add_field(
+            name="XP",
+            value=f"{profile['xp']}/{next_xp}" if next_xp is not None else f"{profile['xp']} (max)",
+            inline=True
+        )
+        embed.add_field(
+            name="Stats",
+            value=(
+                f"❤️ Health: {health}/{stats['max_health']}\n"
+                f"⚔️ Attack: {stats['attack']}\n"
+                f"🛡️ Defense: {stats['defense']}"
+            ),
+            inline=False
+        )
+        embed.add_field(name="Equipment", value=", ".join(equipped) or "None", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def combattop(self, ctx, count: int = 10):
+        """Show the top players by XP"""
+        top = self.leaderboard.top(max(1, min(count, self.leaderboard.size)))
+        if not top:
+            return await ctx.send("Nobody has earned any XP yet!")
+
+        lines = []
+        for rank, (user_id, xp) in enumerate(top, start=1):
+            user = self.bot.get_user(user_id)
+            name = user.display_name if user else f"Unknown ({user_id})"
+            lines.append(f"**{rank}.** {name} - Lv. {self.levels.level(xp)} ({xp} XP)")
+
+        embed = discord.Embed(title="🏆 Combat Leaderboard", description="\n".join(lines), color=0xffd700)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def reloadenemies(self, ctx):
+        """Reload enemy types from enemies.json (owner only)"""
+        try:
+            catalog = load_catalog(self.enemy_file)
+        except (OSError, ValueError) as e:
+            return await ctx.send(f"Failed to load enemies, keeping the current ones: {e}")
+
+        # Fights in progress keep the catalog they were spawned from
+        self.enemies = catalog
+        names = ", ".join(catalog.names)
+        await ctx.send(f"Loaded {len(catalog)} enemy type(s): {names}\nFile: `{self.enemy_file}`")
 
     @commands.command()
     @commands.is_owner()
@@ -321,12 +992,18 @@ class CombatGame(commands.Cog):
         currency_name = await bank.get_currency_name(ctx.guild)
         await ctx.send(f"Healing cost set to {cost} {currency_name}!")
 
-    @commands.Cog.listener()
-    async def on_view_timeout(self, view):
-        """Clean up timed out combats"""
-        for user_id, data in list(self.active_combats.items()):
-            if data["message"] and data["message"].id == view.message.id:
-                del self.active_combats[user_id]
+    def end_session(self, session):
+        """Remove a finished fight"""
+        self.active_combats.pop(session.key)
+        self.stop_session(session)
+
+    def stop_session(self, session):
+        """Stop a fight's buttons and any pending UI update"""
+        if session.view:
+            session.view.stop()
+        if session.render_task:
+            session.render_task.cancel()
+            session.render_task = None
 
 async def setup(bot):
     await bot.add_cog(CombatGame(bot))
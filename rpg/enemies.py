@@ -0,0 +1,115 @@
+import json
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Tuple
+
+ACTIONS = ("attack", "defend")
+
+DEFAULT_ENEMIES = {
+    "monster": {
+        "name": "Monster",
+        "health": [40, 150],      # Inclusive HP range when spawned
+        "damage": [8, 12],        # Inclusive damage range per hit
+        "actions": {"attack": 70, "defend": 30},  # Relative AI weights
+        "weight": 1,              # Relative spawn weight
+    }
+}
+
+
+class EnemyCatalog:
+    """Enemy archetypes compiled into flat, index-aligned tables
+
+    Spawning and AI decisions are a single bisect into precomputed
+    cumulative weights, so nothing is parsed per turn.
+    """
+
+    __slots__ = (
+        "ids",
+        "names",
+        "hp_min",
+        "hp_max",
+        "dmg_min",
+        "dmg_max",
+        "action_cum",
+        "spawn_cum",
+    )
+
+    def __init__(self, enemies: Dict[str, dict]):
+        if not enemies:
+            raise ValueError("The enemy catalog is empty")
+
+        self.ids = tuple(enemies)
+        self.names = []
+        self.hp_min, self.hp_max = [], []
+        self.dmg_min, self.dmg_max = [], []
+        self.action_cum = []
+        spawn_weights = []
+
+        for enemy_id, data in enemies.items():
+            try:
+                hp_min, hp_max = (int(n) for n in data["health"])
+                dmg_min, dmg_max = (int(n) for n in data["damage"])
+                actions = data.get("actions", {"attack": 1})
+                action_weights = [float(actions.get(action, 0)) for action in ACTIONS]
+                spawn_weight = float(data.get("weight", 1))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Enemy `{enemy_id}` is malformed: {e}") from e
+
+            if not (0 < hp_min <= hp_max and 0 <= dmg_min <= dmg_max):
+                raise ValueError(f"Enemy `{enemy_id}` has invalid health or damage ranges")
+            if min(action_weights) < 0 or sum(action_weights) <= 0 or spawn_weight < 0:
+                raise ValueError(f"Enemy `{enemy_id}` has invalid weights")
+
+            self.names.append(data.get("name", enemy_id))
+            self.hp_min.append(hp_min)
+            self.hp_max.append(hp_max)
+            self.dmg_min.append(dmg_min)
+            self.dmg_max.append(dmg_max)
+            self.action_cum.append(tuple(accumulate(action_weights)))
+            spawn_weights.append(spawn_weight)
+
+        self.spawn_cum = tuple(accumulate(spawn_weights))
+        if self.spawn_cum[-1] <= 0:
+            raise ValueError("At least one enemy needs a positive spawn weight")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def spawn(self, rng) -> Tuple[int, int]:
+        """Pick an archetype by spawn weight and roll its health
+
+        Returns (enemy index, health).
+        """
+        if len(self.ids) == 1:
+            index = 0
+        else:
+            index = bisect_right(self.spawn_cum, rng.random() * self.spawn_cum[-1])
+        return index, rng.randint(self.hp_min[index], self.hp_max[index])
+
+    def choose_action(self, index: int, rng) -> str:
+        cumulative = self.action_cum[index]
+        return ACTIONS[bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+    def roll_damage(self, index: int, rng) -> int:
+        return rng.randint(self.dmg_min[index], self.dmg_max[index])
+
+    def attack_chance(self, index: int) -> float:
+        cumulative = self.action_cum[index]
+        return cumulative[0] / cumulative[-1]
+
+
+DEFAULT_CATALOG = EnemyCatalog(DEFAULT_ENEMIES)
+
+
+def load_catalog(path: Path) -> EnemyCatalog:
+    """Load and compile the enemy file, creating it with defaults if missing"""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump({"enemies": DEFAULT_ENEMIES}, f, indent=4)
+        return EnemyCatalog(DEFAULT_ENEMIES)
+
+    with path.open("r") as f:
+        data = json.load(f)
+    return EnemyCatalog(data.get("enemies", {}))
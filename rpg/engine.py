@@ -0,0 +1,227 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .enemies import DEFAULT_CATALOG, EnemyCatalog
+
+# Pure combat rules. Nothing here touches Discord or the global `random`
+# module: every function takes the RNG it should use, so a seeded
+# `random.Random` replays a fight exactly. Enemy stats come from the
+# compiled catalog the fight was spawned from (`state.enemies`, `state.enemy`).
+
+ATTACK_SPREAD = 5            # Player damage is attack ± this
+RAID_TARGET_EVERY = 3        # A raid boss strikes one raider per this many alive
+
+# Raid action queue values
+NO_ACTION = 0
+RAID_ATTACK = 1
+RAID_DEFEND = 2
+
+
+def mitigate(damage: int, defense: int) -> int:
+    """Incoming damage after defense (each point is about 1% less damage)"""
+    if not defense:
+        return damage
+    return max(1, damage * 100 // (100 + defense))
+
+
+def regenerated_health(health: int, max_health: int, since: float, now: float,
+                       rate: float) -> int:
+    """Health after passive regeneration since the last write, computed on read
+
+    `rate` is HP per second. A `since` of 0 means no timestamp was ever
+    stored, so nothing has regenerated yet.
+    """
+    if not since or health >= max_health:
+        return min(health, max_health)
+    return min(max_health, health + int(rate * max(0.0, now - since)))
+
+
+def player_attack(state, attack: int, rng) -> Tuple[int, bool]:
+    """Resolve the player's attack
+
+    Returns (damage dealt, whether the enemy's defense halved it).
+    """
+    base_damage = rng.randint(attack - ATTACK_SPREAD, attack + ATTACK_SPREAD)
+
+    # Reduce damage if enemy is defending
+    reduced = state.enemy_defending
+    if reduced:
+        damage = max(1, base_damage // 2)  # At least 1 damage
+        state.enemy_defending = False  # Reset defense
+    else:
+        damage = base_damage
+
+    state.enemy_health = max(0, state.enemy_health - damage)
+    state.player_defending = False  # Player wasn't defending this turn
+    return damage, reduced
+
+
+def player_defend(state):
+    """The player braces for the next hit"""
+    state.player_defending = True
+    state.enemy_defending = False  # Reset enemy defense
+
+
+def enemy_turn(state, rng, defense: int = 0) -> Tuple[str, int]:
+    """Enemy AI: pick an action from the enemy's weights
+
+    Returns (action, damage) where action is "attack", "block" (the player's
+    defense absorbed the hit) or "defend".
+    """
+    if state.enemies.choose_action(state.enemy, rng) == "defend":
+        state.enemy_defending = True
+        return "defend", 0
+
+    enemy_damage = mitigate(state.enemies.roll_damage(state.enemy, rng), defense)
+    if state.player_defending:
+        state.player_defending = False  # Reset defense
+        return "block", max(1, enemy_damage // 2)  # At least 1 damage
+
+    state.player_health = max(0, state.player_health - enemy_damage)
+    return "attack", enemy_damage
+
+
+def duel_attack(state, side: int, attack: int, defense: int, rng) -> Tuple[int, bool]:
+    """Resolve one duelist's attack on the other
+
+    `state.health` and `state.defending` are indexed by side. Returns
+    (damage dealt, whether the target's defense halved it).
+    """
+    target = 1 - side
+    damage = mitigate(rng.randint(attack - ATTACK_SPREAD, attack + ATTACK_SPREAD), defense)
+
+    reduced = state.defending[target]
+    if reduced:
+        damage = max(1, damage // 2)  # At least 1 damage
+        state.defending[target] = False  # Reset defense
+
+    state.health[target] = max(0, state.health[target] - damage)
+    state.defending[side] = False
+    return damage, reduced
+
+
+def duel_defend(state, side: int):
+    """A duelist braces for the next hit"""
+    state.defending[side] = True
+
+
+def raid_tick(state, attackers: np.ndarray, defenders: np.ndarray, rng) -> Dict:
+    """Apply one tick of queued raid actions as a single batch
+
+    `attackers` and `defenders` are arrays of player slots and `rng` is a
+    NumPy Generator. Raiders brace first, then every attack lands at once,
+    then the boss either defends or strikes one living raider per
+    RAID_TARGET_EVERY. A braced raider takes half damage.
+    """
+    state.defending[defenders] = True
+    state.defending[attackers] = False
+
+    attack = state.attack[attackers]
+    damage = rng.integers(attack - ATTACK_SPREAD, attack + ATTACK_SPREAD + 1)
+    reduced = bool(state.boss_defending and len(attackers))
+    if reduced:
+        damage = np.maximum(1, damage // 2)  # At least 1 damage
+        state.boss_defending = False  # Reset defense
+    state.damage_dealt[attackers] += damage
+    dealt = int(damage.sum())
+    state.boss_health = max(0, state.boss_health - dealt)
+
+    result = {"attacks": len(attackers), "defends": len(defenders), "damage": dealt,
+              "reduced": reduced, "boss": None, "hits": []}
+    if state.boss_health <= 0:
+        return result
+
+    if state.enemies.choose_action(state.enemy, rng) == "defend":
+        state.boss_defending = True
+        result["boss"] = "defend"
+        return result
+
+    alive = np.flatnonzero(state.health[:state.size] > 0)
+    count = min(len(alive), max(1, len(alive) // RAID_TARGET_EVERY))
+    targets = rng.choice(alive, size=count, replace=False)
+    hits = rng.integers(state.enemies.dmg_min[state.enemy], state.enemies.dmg_max[state.enemy] + 1, count)
+    defense = state.defense[targets]
+    hits = np.where(defense > 0, np.maximum(1, hits * 100 // (100 + defense)), hits)
+    blocked = state.defending[targets]
+    hits = np.where(blocked, np.maximum(1, hits // 2), hits)
+    state.health[targets] = np.maximum(0, state.health[targets] - hits)
+    state.defending[targets] = False
+
+    result["boss"] = "attack"
+    result["hits"] = list(zip(targets.tolist(), hits.tolist(), blocked.tolist()))
+    return result
+
+
+def simulate_batch(
+    fights: int,
+    attack: int,
+    health: int,
+    defense: int = 0,
+    defend_chance: float = 0.0,
+    catalog: EnemyCatalog = DEFAULT_CATALOG,
+    enemy: int = 0,
+    enemy_hp: Optional[Tuple[int, int]] = None,
+    max_turns: int = 200,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Simulate many fights at once with the same rules as the functions above
+
+    All fights advance in lockstep as NumPy arrays; finished fights are
+    masked out. The player attacks each turn, or defends with probability
+    `defend_chance`, against archetype `enemy` of `catalog` (optionally with
+    its HP range overridden). Fights still running after `max_turns` count
+    as draws.
+    """
+    rng = np.random.default_rng(seed)
+    n = fights
+    if enemy_hp is None:
+        enemy_hp = (catalog.hp_min[enemy], catalog.hp_max[enemy])
+    enemy_damage = (catalog.dmg_min[enemy], catalog.dmg_max[enemy])
+    attack_chance = catalog.attack_chance(enemy)
+
+    player_hp = np.full(n, health, dtype=np.int64)
+    enemy_hp_arr = rng.integers(enemy_hp[0], enemy_hp[1] + 1, n)
+    player_def = np.zeros(n, dtype=bool)
+    enemy_def = np.zeros(n, dtype=bool)
+    turns = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+
+    for _ in range(max_turns):
+        if not active.any():
+            break
+
+        # Player action
+        defend = active & (rng.random(n) < defend_chance)
+        strike = active & ~defend
+        base = rng.integers(attack - ATTACK_SPREAD, attack + ATTACK_SPREAD + 1, n)
+        damage = np.where(enemy_def, np.maximum(1, base // 2), base)
+        enemy_hp_arr = np.where(strike, np.maximum(0, enemy_hp_arr - damage), enemy_hp_arr)
+        enemy_def &= ~active
+        player_def = np.where(strike, False, player_def | defend)
+
+        # Enemy turn if still alive
+        responds = active & (enemy_hp_arr > 0)
+        attacks = responds & (rng.random(n) < attack_chance)
+        hits = rng.integers(enemy_damage[0], enemy_damage[1] + 1, n)
+        if defense:
+            hits = np.maximum(1, hits * 100 // (100 + defense))
+        blocked = attacks & player_def
+        landed = attacks & ~player_def
+        player_hp = np.where(landed, np.maximum(0, player_hp - hits), player_hp)
+        player_def &= ~blocked
+        enemy_def |= responds & ~attacks
+
+        turns += active
+        active &= (player_hp > 0) & (enemy_hp_arr > 0)
+
+    won = enemy_hp_arr <= 0
+    lost = player_hp <= 0
+    return {
+        "fights": n,
+        "win_rate": float(won.mean()),
+        "loss_rate": float(lost.mean()),
+        "draw_rate": float((~won & ~lost).mean()),
+        "turns": np.bincount(turns, minlength=max_turns + 1),
+        "mean_turns": float(turns.mean()),
+        "mean_health_lost_on_win": float((health - player_hp[won]).mean()) if won.any() else 0.0,
+    }
@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_LEVEL = 50
+
+
+class LevelCurve:
+    """XP thresholds and per-level stat bonuses, precomputed once
+
+    `thresholds[i]` is the total XP needed for level i + 1, so a player's
+    level is a single bisect over their XP.
+    """
+
+    __slots__ = ("thresholds", "attack", "defense", "max_health")
+
+    def __init__(self, max_level: int = MAX_LEVEL, base_xp: int = 100, exponent: float = 1.5,
+                 attack_gain: int = 2, defense_gain: int = 1, health_gain: int = 10):
+        levels = range(max_level)
+        self.thresholds = [int(base_xp * lvl ** exponent) for lvl in levels]
+        self.attack = [lvl * attack_gain for lvl in levels]
+        self.defense = [lvl * defense_gain for lvl in levels]
+        self.max_health = [lvl * health_gain for lvl in levels]
+
+    def level(self, xp: int) -> int:
+        return bisect_right(self.thresholds, xp)
+
+    def next_threshold(self, level: int):
+        """Total XP needed for the next level, or None at max level"""
+        return self.thresholds[level] if level < len(self.thresholds) else None
+
+    def stats(self, profile: Dict, bonus: Optional[Dict] = None) -> Dict:
+        """Effective combat stats: stored base stats plus level and equipment bonuses"""
+        bonus = bonus or {}
+        level = self.level(profile["xp"])
+        i = level - 1
+        return {
+            "level": level,
+            "attack": profile["attack"] + self.attack[i] + bonus.get("attack", 0),
+            "defense": profile["defense"] + self.defense[i] + bonus.get("defense", 0),
+            "max_health": profile["max_health"] + self.max_health[i] + bonus.get("max_health", 0),
+        }
+
+
+class Leaderboard:
+    """Top-N players by XP, updated incrementally as XP changes"""
+
+    def __init__(self, size: int, entries: Iterable[Tuple[int, int]] = ()):
+        self.size = size
+        self._entries: List[Tuple[int, int]] = []  # Sorted (-xp, user_id)
+        self._xp: Dict[int, int] = {}              # XP of users on the board
+        for user_id, xp in entries:
+            self.update(user_id, xp)
+
+    def remove(self, user_id: int) -> bool:
+        xp = self._xp.pop(user_id, None)
+        if xp is None:
+            return False
+        del self._entries[bisect_left(self._entries, (-xp, user_id))]
+        return True
+
+    def update(self, user_id: int, xp: int) -> bool:
+        """Record a user's XP; returns True if the board changed"""
+        was_listed = self.remove(user_id)
+        entry = (-xp, user_id)
+        if len(self._entries) >= self.size and entry > self._entries[-1]:
+            return was_listed
+
+        insort(self._entries, entry)
+        self._xp[user_id] = xp
+        if len(self._entries) > self.size:
+            _, dropped = self._entries.pop()
+            del self._xp[dropped]
+        return True
+
+    def top(self, count: int) -> List[Tuple[int, int]]:
+        """The best `count` players as (user_id, xp)"""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._entries[:count]]
+
+    def to_list(self) -> List[List[int]]:
+        return [[user_id, xp] for user_id, xp in self.top(self.size)]
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+BAND_WIDTH = 100     # Rating points per queue bucket
+REACH = 2            # Buckets on either side searched for an opponent
+ELO_K = 32
+
+
+class MatchQueue:
+    """Players waiting for a duel, bucketed by rating band
+
+    Each band is a FIFO of waiting players. Finding an opponent checks the
+    player's own band first, then the neighbouring bands outwards up to
+    `reach` away, so pairing costs the same however many players wait.
+    Players further apart than that are never paired.
+    """
+
+    def __init__(self, band_width: int = BAND_WIDTH, reach: int = REACH):
+        self.band_width = band_width
+        self._offsets = [0]
+        for distance in range(1, reach + 1):
+            self._offsets += [-distance, distance]
+        self._buckets: Dict[int, OrderedDict] = {}  # {band: {user_id: rating}}, oldest first
+        self._bands: Dict[int, int] = {}             # {user_id: band}
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._bands
+
+    def __len__(self) -> int:
+        return len(self._bands)
+
+    def band(self, rating: int) -> int:
+        return rating // self.band_width
+
+    def add(self, user_id: int, rating: int):
+        band = self.band(rating)
+        self._bands[user_id] = band
+        self._buckets.setdefault(band, OrderedDict())[user_id] = rating
+
+    def remove(self, user_id: int) -> bool:
+        band = self._bands.pop(user_id, None)
+        if band is None:
+            return False
+        bucket = self._buckets[band]
+        del bucket[user_id]
+        if not bucket:
+            del self._buckets[band]
+        return True
+
+    def match(self, rating: int) -> Optional[Tuple[int, int]]:
+        """Pop the longest-waiting player in the nearest band, as (user_id, rating)"""
+        band = self.band(rating)
+        for offset in self._offsets:
+            bucket = self._buckets.get(band + offset)
+            if bucket:
+                user_id, opponent_rating = bucket.popitem(last=False)
+                del self._bands[user_id]
+                if not bucket:
+                    del self._buckets[band + offset]
+                return user_id, opponent_rating
+        return None
+
+
+def expected_score(rating: int, opponent: int) -> float:
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def elo_update(winner: int, loser: int, k: int = ELO_K) -> Tuple[int, int]:
+    """New (winner, loser) ratings after one game"""
+    change = round(k * (1 - expected_score(winner, loser)))
+    return winner + change, loser - change
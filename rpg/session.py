@@ -0,0 +1,229 @@
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class CombatSession:
+    """State for one active fight"""
+
+    __slots__ = (
+        "user_id",
+        "profile",
+        "currency_name",
+        "enemies",
+        "enemy",
+        "stats",
+        "xp",
+        "start_health",
+        "player_health",
+        "enemy_health",
+        "enemy_max_health",
+        "player_defending",
+        "enemy_defending",
+        "message",
+        "view",
+        "log",
+        "render_task",
+        "last_active",
+    )
+
+    def __init__(self, user_id: int, profile: dict, enemies, enemy: int, enemy_health: int):
+        self.user_id = user_id
+        self.profile = profile  # Stats as loaded from Config when the fight started
+        self.currency_name = None  # Set when the bank is global
+        self.enemies = enemies  # Catalog the enemy was spawned from, kept across reloads
+        self.enemy = enemy  # Archetype index into the catalog
+        self.stats = None  # Effective stats for this fight, including level bonuses
+        self.xp = profile["xp"]
+        self.start_health = profile["health"]  # Including regeneration before the fight
+        self.player_health = profile["health"]
+        self.enemy_health = enemy_health
+        self.enemy_max_health = enemy_health
+        self.player_defending = False
+        self.enemy_defending = False
+        self.message = None
+        self.view = None
+        self.log = deque(maxlen=8)  # Turn messages not yet shown
+        self.render_task = None  # Pending coalesced message edit
+        self.last_active = time.monotonic()
+
+    @property
+    def key(self) -> int:
+        return self.user_id
+
+
+class DuelSession:
+    """State for one ranked duel, shared by both fighters
+
+    Per-fighter state is kept in two-element lists indexed by side (0 or 1).
+    """
+
+    __slots__ = (
+        "key",
+        "players",
+        "stats",
+        "ratings",
+        "health",
+        "defending",
+        "turn",
+        "message",
+        "view",
+        "log",
+        "render_task",
+        "last_active",
+    )
+
+    def __init__(self, key: int, players: List[int], first: int):
+        self.key = key
+        self.players = players  # User ids by side
+        self.stats = [None, None]  # Effective stats, filled in before the first turn
+        self.ratings = [None, None]  # Ratings when the duel started
+        self.health = [0, 0]
+        self.defending = [False, False]
+        self.turn = first  # Side whose move it is
+        self.message = None
+        self.view = None
+        self.log = deque(maxlen=8)  # Turn messages not yet shown
+        self.render_task = None  # Pending coalesced message edit
+        self.last_active = time.monotonic()
+
+    def side(self, user_id: int) -> int:
+        return self.players.index(user_id)
+
+
+class RaidSession:
+    """State for one raid: many players against one boss on a shared message
+
+    Per-player state lives in fixed-size NumPy arrays indexed by slot, with
+    slots handed out in join order. `actions` is the raid's action queue:
+    each slot holds the action its player queued for the next tick.
+    """
+
+    __slots__ = (
+        "key",
+        "players",
+        "slots",
+        "enemies",
+        "enemy",
+        "boss_health",
+        "boss_max_health",
+        "boss_defending",
+        "health",
+        "max_health",
+        "attack",
+        "defense",
+        "defending",
+        "damage_dealt",
+        "actions",
+        "joining",
+        "dirty",
+        "message",
+        "view",
+        "log",
+        "render_task",
+        "last_active",
+    )
+
+    def __init__(self, key: int, capacity: int, enemies, enemy: int):
+        self.key = key  # Channel id, one raid per channel
+        self.players: List[int] = []  # User ids by slot
+        self.slots: Dict[int, int] = {}  # {user_id: slot}
+        self.enemies = enemies
+        self.enemy = enemy
+        self.boss_health = 0  # Grows as players join
+        self.boss_max_health = 0
+        self.boss_defending = False
+        self.health = np.zeros(capacity, dtype=np.int64)
+        self.max_health = np.zeros(capacity, dtype=np.int64)
+        self.attack = np.zeros(capacity, dtype=np.int64)
+        self.defense = np.zeros(capacity, dtype=np.int64)
+        self.defending = np.zeros(capacity, dtype=bool)
+        self.damage_dealt = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.joining = 0  # Players whose stats are still loading
+        self.dirty = False  # Something changed that the message doesn't show yet
+        self.message = None
+        self.view = None
+        self.log = deque(maxlen=8)  # Tick summaries not yet shown
+        self.render_task = None  # Tick loop
+        self.last_active = time.monotonic()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.health)
+
+    @property
+    def size(self) -> int:
+        return len(self.players)
+
+    def add_player(self, user_id: int, stats: dict) -> int:
+        slot = len(self.players)
+        self.players.append(user_id)
+        self.slots[user_id] = slot
+        self.health[slot] = self.max_health[slot] = stats["max_health"]
+        self.attack[slot] = stats["attack"]
+        self.defense[slot] = stats["defense"]
+        self.dirty = True
+        return slot
+
+
+class SessionIndex:
+    """Active sessions kept in last-activity order
+
+    The oldest session is always first, so expiring idle sessions only
+    touches the ones that actually expired.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # {session.key: session}
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, key: int):
+        return self._sessions.get(key)
+
+    def values(self) -> List:
+        return list(self._sessions.values())
+
+    def add(self, session):
+        session.last_active = time.monotonic()
+        self._sessions[session.key] = session
+
+    def touch(self, session):
+        """Mark a session as active, pushing back its expiry
+
+        A session already popped for expiry is left alone; the reaper
+        finishes it.
+        """
+        if self._sessions.get(session.key) is not session:
+            return
+        session.last_active = time.monotonic()
+        self._sessions.move_to_end(session.key)
+
+    def pop(self, key: int):
+        return self._sessions.pop(key, None)
+
+    def next_expiry(self) -> Optional[float]:
+        """Monotonic time at which the oldest session expires"""
+        for session in self._sessions.values():
+            return session.last_active + self.ttl
+        return None
+
+    def pop_expired(self, now: Optional[float] = None) -> List:
+        """Remove and return every session idle for longer than the TTL"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if session.last_active + self.ttl > now:
+                break
+            del self._sessions[key]
+            expired.append(session)
+        return expired
@@ -0,0 +1,102 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# One JSON object per line:
+#   {"op": "hold", "lobby": id, "guild": guild_id, "user": user_id, "amount": credits}
+#   {"op": "payout", "lobby": id, "guild": guild_id, "owed": {user_id: credits}}
+#                                                     (winnings replace the held fees)
+#   {"op": "release", "lobby": id, "user": user_id}   (that refund or winning is being paid)
+#   {"op": "settle", "lobby": id}                     (the house kept the pot)
+
+
+class EscrowJournal:
+    """Append-only record of entry fees held by open lobbies
+
+    Fees are written when they are taken. When a game ends the winnings
+    owed to each survivor are written in one line that replaces the fees,
+    and every entry is released just before it is deposited, so after a
+    crash the file still says who is owed what, and nothing is paid twice.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _append(self, entry: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def hold(self, lobby: str, guild_id: int, user_id: int, amount: int):
+        self._append({"op": "hold", "lobby": lobby, "guild": guild_id, "user": user_id, "amount": amount})
+
+    def release(self, lobby: str, user_id: int):
+        self._append({"op": "release", "lobby": lobby, "user": user_id})
+
+    def payout(self, lobby: str, guild_id: int, owed: Dict[int, int]):
+        self._append({"op": "payout", "lobby": lobby, "guild": guild_id,
+                      "owed": {str(user_id): amount for user_id, amount in owed.items()}})
+
+    def settle(self, lobby: str):
+        self._append({"op": "settle", "lobby": lobby})
+
+    def unsettled(self) -> Dict[str, Tuple[str, List[Tuple[int, int, int]]]]:
+        """Credits still owed, as {lobby: (kind, [(guild_id, user_id, amount), ...])}
+
+        `kind` is "refund" for entry fees of a lobby that never finished and
+        "payout" for winnings of a game that ended.
+        """
+        held = {}     # {lobby: {user_id: (guild_id, user_id, amount)}}
+        payouts = {}  # {lobby: {user_id: (guild_id, user_id, amount)}}
+        if not self.path.exists():
+            return {}
+
+        with self.path.open("r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partial line left by an interrupted write
+                lobby = entry.get("lobby")
+                if entry.get("op") == "hold":
+                    held.setdefault(lobby, {})[entry["user"]] = (entry["guild"], entry["user"], entry["amount"])
+                elif entry.get("op") == "payout":
+                    held.pop(lobby, None)
+                    payouts.setdefault(lobby, {}).update(
+                        (int(user_id), (entry["guild"], int(user_id), amount))
+                        for user_id, amount in entry["owed"].items()
+                    )
+                elif entry.get("op") == "release":
+                    owed = payouts[lobby] if lobby in payouts else held.get(lobby, {})
+                    owed.pop(entry["user"], None)
+                elif entry.get("op") == "settle":
+                    held.pop(lobby, None)
+                    payouts.pop(lobby, None)
+
+        pending = {lobby: ("refund", list(fees.values())) for lobby, fees in held.items() if fees}
+        pending.update((lobby, ("payout", list(owed.values()))) for lobby, owed in payouts.items() if owed)
+        return pending
+
+    def compact(self) -> Dict[str, Tuple[str, List[Tuple[int, int, int]]]]:
+        """Rewrite the journal with only the credits still owed and return them"""
+        pending = self.unsettled()
+        if not self.path.exists():
+            return pending
+
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w") as f:
+            for lobby, (kind, entries) in pending.items():
+                if kind == "payout":
+                    owed = {str(user_id): amount for _, user_id, amount in entries}
+                    f.write(json.dumps({"op": "payout", "lobby": lobby, "guild": entries[0][0], "owed": owed}) + "\n")
+                    continue
+                for guild_id, user_id, amount in entries:
+                    entry = {"op": "hold", "lobby": lobby, "guild": guild_id, "user": user_id, "amount": amount}
+                    f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return pending
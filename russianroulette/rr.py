@@ -1,18 +1,83 @@
 import random
 import asyncio
+import heapq
+import time
 import discord
-from redbot.core import commands, bank
-from redbot.core.errors import BalanceTooHigh
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+from redbot.core import commands, bank, data_manager, Config
+
+from .escrow import EscrowJournal
 
 class RussianRoulette(commands.Cog):
     """Multiplayer Russian Roulette with consistent bullet mechanics"""
 
-    ENTRY_FEE = 100000
+    ENTRY_FEE = 100000  # Default stake for a table
+    LOBBY_TTL = 600  # Seconds an unstarted lobby stays open
+    ROUND_DELAY = 2  # Seconds between trigger pulls
+    EDIT_INTERVAL = 4  # Minimum seconds between edits of the game message
+    BANK_CONCURRENCY = 5  # Member lookups and deposits in flight at once
+    MEMBER_TTL = 300  # Seconds a resolved member stays cached
 
     def __init__(self, bot):
         self.bot = bot
-        self.games = {}
-        self.join_lock = asyncio.Lock()
+        self.config = Config.get_conf(self, identifier=735914682)
+        self.config.register_channel(stake=self.ENTRY_FEE)
+        self.stakes = {}  # {channel_id: stake} cached from Config
+        self.games = {}  # {channel_id: lobby}, one table per channel
+        self.locks = defaultdict(asyncio.Lock)  # {channel_id: Lock} guarding that table's lobby
+        self.runners = {}  # {channel_id: Task} for games being played
+        self.expiry = []  # Heap of (expires_at, channel_id, lobby id) shared by all tables
+        self.expiry_added = asyncio.Event()
+        self.members = OrderedDict()  # {(guild_id, user_id): (expires_at, member)}, oldest first
+        self.escrow = EscrowJournal(data_manager.cog_data_path(self) / "escrow.jsonl")
+        self.bot.loop.create_task(self.settle_journal(self.escrow.compact()))
+        self.expiry_task = self.bot.loop.create_task(self.expire_lobbies())
+
+    def cog_unload(self):
+        self.expiry_task.cancel()
+        # Unfinished refunds and payouts are left in the escrow journal,
+        # which the next load settles, so nothing is paid twice on reload
+        for task in self.runners.values():
+            task.cancel()
+
+    async def table_stake(self, channel) -> int:
+        """Entry fee for the table in a channel"""
+        stake = self.stakes.get(channel.id)
+        if stake is None:
+            stake = self.stakes[channel.id] = await self.config.channel(channel).stake()
+        return stake
+
+    async def expire_lobbies(self):
+        """Close lobbies that waited too long to start, across every table"""
+        while True:
+            if not self.expiry:
+                self.expiry_added.clear()
+                await self.expiry_added.wait()
+                continue
+
+            # Lobbies all live for LOBBY_TTL, so new entries never expire before the top one
+            expires_at, table, lobby = self.expiry[0]
+            await asyncio.sleep(max(0.0, expires_at - time.time()))
+            heapq.heappop(self.expiry)
+
+            channel = self.bot.get_channel(table)
+            async with self.locks[table]:
+                game = self.games.get(table)
+                # Entries for lobbies that already started or were canceled are skipped
+                if not channel or not game or game["id"] != lobby or game["in_progress"]:
+                    continue
+                refunded, failed = await self.refund_lobby(channel.guild, table)
+
+            msg = "⌛ The lobby expired before it started. "
+            if refunded:
+                msg += f"Refunded: {', '.join(refunded)}. "
+            if failed:
+                msg += f"Failed to refund: {', '.join(failed)}"
+            try:
+                await channel.send(msg)
+            except discord.HTTPException:
+                pass
 
     async def get_member(self, guild: discord.Guild, user_id: int) -> discord.Member:
         """Get member from guild or fetch globally if needed"""
@@ -28,57 +93,137 @@ class RussianRoulette(commands.Cog):
             except discord.NotFound:
                 return None
 
-    async def refund_player(self, ctx, guild: discord.Guild, user_id: int):
-        """Safely refund a player"""
-        try:
-            member = await self.get_member(guild, user_id)
+    async def resolve_members(self, guild: discord.Guild, user_ids) -> Dict[int, Optional[discord.abc.User]]:
+        """Look up many players at once, through a short-lived cache
+
+        Players missing from both caches are fetched concurrently.
+        """
+        now = time.monotonic()
+        while self.members:  # Entries expire in insertion order
+            key, (expires, _) = next(iter(self.members.items()))
+            if expires > now:
+                break
+            del self.members[key]
+
+        resolved = {}
+        missing = []
+        for user_id in user_ids:
+            cached = self.members.get((guild.id, user_id))
+            member = cached[1] if cached else guild.get_member(user_id)
             if member:
-                await bank.deposit_credits(member, self.ENTRY_FEE)
-                return True
-        except (BalanceTooHigh, ValueError, TypeError, AttributeError):
-            pass
-        return False
-
-    async def refund_lobby(self, ctx, guild_id: int):
-        """Refund all players in a lobby"""
-        if guild_id not in self.games:
+                resolved[user_id] = member
+            else:
+                missing.append(user_id)
+
+        semaphore = asyncio.Semaphore(self.BANK_CONCURRENCY)
+
+        async def fetch(user_id: int):
+            async with semaphore:
+                try:
+                    resolved[user_id] = await self.get_member(guild, user_id)
+                except discord.HTTPException:
+                    resolved[user_id] = None
+            if resolved[user_id]:
+                self.members[(guild.id, user_id)] = (now + self.MEMBER_TTL, resolved[user_id])
+
+        await asyncio.gather(*(fetch(user_id) for user_id in missing))
+        return resolved
+
+    async def deposit_all(self, guild: discord.Guild, amounts: Dict[int, int], lobby: str,
+                          kind: str = "refund") -> Tuple[List[int], Dict[int, str]]:
+        """Deposit credits owed by a lobby concurrently with bounded parallelism
+
+        Each escrow entry is released just before its deposit and written
+        back if the deposit fails. Returns (ids paid, {id: reason} for
+        deposits that failed).
+        """
+        members = await self.resolve_members(guild, amounts)
+        semaphore = asyncio.Semaphore(self.BANK_CONCURRENCY)
+        paid = []
+        failed = {}
+
+        async def deposit(user_id: int, amount: int):
+            member = members.get(user_id)
+            if member is None:
+                failed[user_id] = "Player not found"
+                return
+            async with semaphore:
+                self.escrow.release(lobby, user_id)
+                try:
+                    await bank.deposit_credits(member, amount)
+                    paid.append(user_id)
+                except (Exception, asyncio.CancelledError) as e:
+                    # Owe it again; a cancelled deposit is left to the next load
+                    if kind == "payout":
+                        self.escrow.payout(lobby, guild.id, {user_id: amount})
+                    else:
+                        self.escrow.hold(lobby, guild.id, user_id, amount)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    failed[user_id] = str(e)
+
+        await asyncio.gather(*(deposit(user_id, amount) for user_id, amount in amounts.items()))
+        return paid, failed
+
+    async def settle_journal(self, pending):
+        """Finish what the escrow journal still owes, e.g. before a restart or reload
+
+        Lobbies that never finished are refunded; games that ended pay
+        their remaining winnings.
+        """
+        if not pending:
+            return
+        await self.bot.wait_until_ready()
+        for lobby, (kind, entries) in pending.items():
+            guild = self.bot.get_guild(entries[0][0])
+            if not guild:
+                print(f"Could not settle roulette lobby {lobby} ({kind}): guild unavailable")
+                continue
+            amounts = {user_id: amount for _, user_id, amount in entries}
+            paid, failed = await self.deposit_all(guild, amounts, lobby, kind)
+            for user_id, reason in failed.items():
+                print(f"Could not settle {kind} of {user_id} from roulette lobby {lobby}: {reason}")
+
+    async def refund_lobby(self, guild: discord.Guild, table: int):
+        """Refund all players in a table's lobby"""
+        if table not in self.games:
             return [], []
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return [], []
+        game = self.games[table]
+        amounts = {user_id: game["stake"] for user_id in game["players"]}
+        paid, failed_ids = await self.deposit_all(guild, amounts, game["id"])
 
-        game = self.games[guild_id]
-        refunded = []
-        failed = []
+        refunded = [f"<@{user_id}> ({game['players'][user_id]})" for user_id in paid]
+        failed = [f"<@{user_id}> ({game['players'][user_id]})" for user_id in failed_ids]
 
-        for user_id, user_name in list(game["players"].items()):
-            if await self.refund_player(ctx, guild, user_id):
-                refunded.append(f"<@{user_id}> ({user_name})")
-            else:
-                failed.append(f"<@{user_id}> ({user_name})")
-
-        del self.games[guild_id]
+        del self.games[table]
         return refunded, failed
 
     @commands.command()
     @commands.guild_only()
     async def rrjoin(self, ctx):
-        """Join Russian Roulette (10,000 credit entry)"""
+        """Join the Russian Roulette table in this channel"""
         guild = ctx.guild
         user = ctx.author
-        entry_fee = self.ENTRY_FEE
+        table = ctx.channel.id
+        stake = await self.table_stake(ctx.channel)
 
-        async with self.join_lock:
+        async with self.locks[table]:
             # Initialize game state
-            if guild.id not in self.games:
-                self.games[guild.id] = {
+            if table not in self.games:
+                lobby = f"{table}-{time.time_ns()}"  # Escrow journal key
+                self.games[table] = {
+                    "id": lobby,
+                    "stake": stake,  # Fixed for the lobby even if the table's stake changes
                     "players": {},
                     "pot": 0,
                     "in_progress": False
                 }
+                heapq.heappush(self.expiry, (time.time() + self.LOBBY_TTL, table, lobby))
+                self.expiry_added.set()
 
-            game = self.games[guild.id]
+            game = self.games[table]
+            entry_fee = game["stake"]
 
             # Validation checks
             if game["in_progress"]:
@@ -97,48 +242,63 @@ class RussianRoulette(commands.Cog):
                 await bank.withdraw_credits(user, entry_fee)
             except Exception as e:
                 return await ctx.send(f"❌ Bank error: {str(e)}")
+            self.escrow.hold(game["id"], guild.id, user.id, entry_fee)
 
             # Add player
             game["players"][user.id] = user.display_name
             game["pot"] += entry_fee
-            await ctx.send(
-                f"🔫 {user.mention} joined! "
-                f"Players: **{len(game['players'])}/6** | "
-                f"Pot: **{game['pot']:,} credits**\n"
-                f"Use `{ctx.prefix}rrstart` to begin or wait for more players"
-            )
+            players = len(game["players"])
+            pot = game["pot"]
 
-            # Auto-start if full
-            if len(game["players"]) == 6:
-                await ctx.invoke(self.rrstart)
+        await ctx.send(
+            f"🔫 {user.mention} joined! "
+            f"Players: **{players}/6** | "
+            f"Pot: **{pot:,} credits**\n"
+            f"Use `{ctx.prefix}rrstart` to begin or wait for more players"
+        )
+
+        # Auto-start if full, outside the lock so the game doesn't hold up the lobby
+        if players == 6:
+            await ctx.invoke(self.rrstart)
 
     @commands.command()
     @commands.guild_only()
     async def rrstart(self, ctx):
-        """Start Russian Roulette with current players"""
+        """Start Russian Roulette with the players at this channel's table"""
         guild = ctx.guild
+        table = ctx.channel.id
 
-        # Lobby check
-        if guild.id not in self.games or not self.games[guild.id]["players"]:
-            return await ctx.send("❌ No active lobby! Use `!rrjoin` first")
+        async with self.locks[table]:
+            # Lobby check
+            if table not in self.games or not self.games[table]["players"]:
+                return await ctx.send("❌ No active lobby! Use `!rrjoin` first")
 
-        game = self.games[guild.id]
+            game = self.games[table]
 
-        if game["in_progress"]:
-            return await ctx.send("🚨 Game already running!")
+            if game["in_progress"]:
+                return await ctx.send("🚨 Game already running!")
+
+            if len(game["players"]) < 2:
+                refunded, failed = await self.refund_lobby(guild, table)
+                msg = "⚠️ Need at least 2 players! "
+                if refunded:
+                    msg += f"Refunded: {', '.join(refunded)}. "
+                if failed:
+                    msg += f"Failed to refund: {', '.join(failed)}"
+                return await ctx.send(msg)
+
+            # Close the lobby; the game itself runs outside the lock
+            game["in_progress"] = True
 
-        if len(game["players"]) < 2:
-            refunded, failed = await self.refund_lobby(ctx, guild.id)
-            msg = "⚠️ Need at least 2 players! "
-            if refunded:
-                msg += f"Refunded: {', '.join(refunded)}. "
-            if failed:
-                msg += f"Failed to refund: {', '.join(failed)}"
-            return await ctx.send(msg)
+        self.runners[table] = asyncio.create_task(self.run_game(ctx, game))
 
+    async def run_game(self, ctx, game):
+        """Play a started game in the background, revealing shots on one message"""
+        guild = ctx.guild
+        table = ctx.channel.id
+        paying = False
         try:
             # Game setup
-            game["in_progress"] = True
             player_data = list(game["players"].items())
             random.shuffle(player_data)
 
@@ -153,82 +313,104 @@ class RussianRoulette(commands.Cog):
             current_chamber = random.randint(0, 5)
 
             # Show game start
-            embed = discord.Embed(
-                title="💀 RUSSIAN ROULETTE STARTING",
-                color=0xff0000,
-                description=(
-                    f"**Pot:** {game['pot']:,} credits\n"
-                    f"**Bullets:** {bullet_count}/6\n"
-                    f"**Players:** {len(player_data)}"
-                )
+            header = (
+                f"**Pot:** {game['pot']:,} credits\n"
+                f"**Bullets:** {bullet_count}/6\n"
+                f"**Players:** {len(player_data)}\n"
             )
+            embed = discord.Embed(title="💀 RUSSIAN ROULETTE STARTING", color=0xff0000, description=header)
+            message = await ctx.send(embed=embed)
+            last_edit = time.monotonic()
 
-            await ctx.send(embed=embed)
-
-            # Game sequence
+            # Game sequence; shots are revealed in batches so edits stay under the rate limit
             survivors = []
+            lines = []
             for user_id, display_name in player_data:
-                await asyncio.sleep(2)
+                await asyncio.sleep(self.ROUND_DELAY)
 
                 # Check current chamber
                 if chamber[current_chamber]:
-                    await ctx.send(f"💥 **BANG!** <@{user_id}> ({display_name}) is eliminated!")
+                    lines.append(f"💥 **BANG!** <@{user_id}> ({display_name}) is eliminated!")
                 else:
-                    await ctx.send(f"✅ *click* <@{user_id}> ({display_name}) survives!")
+                    lines.append(f"✅ *click* <@{user_id}> ({display_name}) survives!")
                     survivors.append((user_id, display_name))
 
                 # Advance to next chamber
                 current_chamber = (current_chamber + 1) % 6
 
-            # Payouts
+                if time.monotonic() - last_edit >= self.EDIT_INTERVAL:
+                    embed.description = header + "\n" + "\n".join(lines)
+                    await self.edit_game(message, embed)
+                    last_edit = time.monotonic()
+
+            # Payouts; if the game is cancelled partway the escrow journal finishes them
             await asyncio.sleep(1)
-            if survivors:
-                winnings = game["pot"] // len(survivors)
-                winners_msg = []
-                failed_msg = []
-
-                for user_id, display_name in survivors:
-                    try:
-                        member = await self.get_member(guild, user_id)
-                        if member:
-                            await bank.deposit_credits(member, winnings)
-                            winners_msg.append(f"<@{user_id}> ({display_name})")
-                        else:
-                            raise ValueError("Player not found")
-                    except Exception as e:
-                        failed_msg.append(f"<@{user_id}> - {str(e)}")
-
-                result = f"🎉 **{len(survivors)} SURVIVOR(S) WIN!**\nEach receives **{winnings:,} credits**"
-                if winners_msg:
-                    result += f"\nWinners: {', '.join(winners_msg)}"
-                if failed_msg:
-                    result += f"\n❌ Failed payments: {', '.join(failed_msg)}"
-
-                await ctx.send(result)
-            else:
-                await ctx.send("☠️ **NO SURVIVORS!** The house keeps the pot!")
+            paying = True
+            result = await self.pay_survivors(guild, game, survivors)
+
+            embed.title = "💀 RUSSIAN ROULETTE"
+            embed.description = header + "\n" + "\n".join(lines) + "\n\n" + result
+            await self.edit_game(message, embed)
 
+        except asyncio.CancelledError:
+            # Only happens on unload; the held fees stay in the journal for the next load
+            raise
         except Exception as e:
-            await ctx.send(f"⚠️ Game error: {str(e)}. Refunding all players...")
-            refunded, failed = await self.refund_lobby(ctx, guild.id)
+            if paying:
+                return await ctx.send(f"⚠️ Game error after payouts: {str(e)}")
+            refunded, failed = await self.refund_lobby(guild, table)
+            msg = f"⚠️ Game error: {str(e)}. Refunding all players..."
             if refunded:
-                await ctx.send(f"✅ Refunded: {', '.join(refunded)}")
+                msg += f"\n✅ Refunded: {', '.join(refunded)}"
             if failed:
-                await ctx.send(f"❌ Failed to refund: {', '.join(failed)}")
+                msg += f"\n❌ Failed to refund: {', '.join(failed)}"
+            await ctx.send(msg)
         finally:
             # Cleanup
-            if guild.id in self.games:
-                del self.games[guild.id]
+            if self.games.get(table) is game:
+                del self.games[table]
+            self.runners.pop(table, None)
+
+    async def edit_game(self, message, embed):
+        try:
+            await message.edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+    async def pay_survivors(self, guild, game, survivors):
+        """Split the pot between survivors and describe the result"""
+        if not survivors:
+            self.escrow.settle(game["id"])
+            return "☠️ **NO SURVIVORS!** The house keeps the pot!"
+
+        winnings = game["pot"] // len(survivors)
+        names = dict(survivors)
+        owed = {user_id: winnings for user_id in names}
+        self.escrow.payout(game["id"], guild.id, owed)  # Replaces the held fees
+        paid, failed = await self.deposit_all(guild, owed, game["id"], "payout")
+        winners_msg = [f"<@{user_id}> ({names[user_id]})" for user_id in paid]
+        failed_msg = [f"<@{user_id}> - {reason}" for user_id, reason in failed.items()]
+
+        result = f"🎉 **{len(survivors)} SURVIVOR(S) WIN!**\nEach receives **{winnings:,} credits**"
+        if winners_msg:
+            result += f"\nWinners: {', '.join(winners_msg)}"
+        if failed_msg:
+            result += f"\n❌ Failed payments: {', '.join(failed_msg)}"
+        return result
 
     @commands.command()
     @commands.guild_only()
     async def rrcancel(self, ctx):
-        """Cancel the current lobby and refund players"""
+        """Cancel this channel's lobby and refund players"""
         guild = ctx.guild
-        if guild.id not in self.games:
-            return await ctx.send("❌ No active lobby!")
-
-        refunded, failed = await self.refund_lobby(ctx, guild.id)
+        table = ctx.channel.id
+        async with self.locks[table]:
+            if table not in self.games:
+                return await ctx.send("❌ No active lobby!")
+            if self.games[table]["in_progress"]:
+                return await ctx.send("🚨 The game is already running!")
+
+            refunded, failed = await self.refund_lobby(guild, table)
         msg = "✅ Lobby canceled. "
         if refunded:
             msg += f"Refunded: {', '.join(refunded)}. "
@@ -236,5 +418,36 @@ class RussianRoulette(commands.Cog):
             msg += f"Failed to refund: {', '.join(failed)}"
         await ctx.send(msg)
 
+    @commands.command()
+    @commands.guild_only()
+    async def rrtables(self, ctx):
+        """List the open Russian Roulette tables in this server"""
+        lines = []
+        for channel in ctx.guild.text_channels:
+            game = self.games.get(channel.id)
+            if game:
+                status = "🔫 Playing" if game["in_progress"] else f"{len(game['players'])}/6 players"
+                lines.append(f"{channel.mention} - {game['stake']:,} credits - {status}")
+        if not lines:
+            return await ctx.send(f"❌ No open tables! Use `{ctx.prefix}rrjoin` to open one.")
+        await ctx.send(embed=discord.Embed(title="💀 Roulette Tables", description="\n".join(lines), color=0xff0000))
+
+    @commands.group()
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    async def rrset(self, ctx):
+        """Russian Roulette table settings"""
+        pass
+
+    @rrset.command(name="stake")
+    async def rrset_stake(self, ctx, amount: int, channel: discord.TextChannel = None):
+        """Set the entry fee for a channel's table (defaults to this channel)"""
+        channel = channel or ctx.channel
+        if amount < 1:
+            return await ctx.send("❌ The stake must be at least 1 credit!")
+        await self.config.channel(channel).stake.set(amount)
+        self.stakes[channel.id] = amount
+        await ctx.send(f"✅ Entry fee for {channel.mention} set to **{amount:,} credits**. Open lobbies keep their stake.")
+
 async def setup(bot):
     await bot.add_cog(RussianRoulette(bot))
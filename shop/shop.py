@@ -64,6 +64,14 @@ class PaginatorView(View):
 class ShopSystem(commands.Cog):
     """Shop system with inventory, global shop, and player marketplace"""
 
+    FILE_VERSION = 1  # Bumped when existing shop files need migrating
+    # Combat gear for the default items, added to shop files created before items had stats
+    DEFAULT_EQUIPMENT = {
+        "sword": {"slot": "weapon", "stats": {"attack": 5}},
+        "shield": {"slot": "shield", "stats": {"defense": 5}},
+    }
+    COMBAT_STATS = ("attack", "defense", "max_health")
+
     def __init__(self, bot):
         self.bot = bot
         self.data_path = data_manager.cog_data_path(self)
@@ -101,7 +109,9 @@ class ShopSystem(commands.Cog):
                         "price": 500,
                         "limited": True,
                         "quantity": 10,
-                        "image_url": "https://raw.githubusercontent.com/yourusername/yourrepo/main/sword.png"
+                        "image_url": "https://raw.githubusercontent.com/yourusername/yourrepo/main/sword.png",
+                        "slot": "weapon",
+                        "stats": {"attack": 5}
                     },
                     "potion": {
                         "name": "Health Potion",
@@ -116,12 +126,13 @@ class ShopSystem(commands.Cog):
                         "price": 300,
                         "limited": True,
                         "quantity": 5,
-                        "image_url": "https://raw.githubusercontent.com/yourusername/yourrepo/main/shield.png"
+                        "image_url": "https://raw.githubusercontent.com/yourusername/yourrepo/main/shield.png",
+                        "slot": "shield",
+                        "stats": {"defense": 5}
                     }
                 }
-                with self.shop_file.open("w") as f:
-                    json.dump({"items": default_items}, f, indent=4)
                 self.shop_items = default_items
+                await self._save_shop_items()
             else:
                 # Load existing items
                 with self.shop_file.open("r") as f:
@@ -134,22 +145,37 @@ class ShopSystem(commands.Cog):
                             item_data["limited"] = False
                         if "quantity" not in item_data and item_data["limited"]:
                             item_data["quantity"] = 1
+
+                if data.get("version", 0) < 1:
+                    # One-time migration: give the default gear its combat stats
+                    for item_id, equipment in self.DEFAULT_EQUIPMENT.items():
+                        item_data = self.shop_items.get(item_id)
+                        if item_data is not None and "slot" not in item_data:
+                            item_data.update(slot=equipment["slot"], stats=dict(equipment["stats"]))
+                    await self._save_shop_items()
         except Exception as e:
             print(f"Error loading shop items: {e}")
             self.shop_items = {}
         finally:
             self.ready.set()
+            # Let other cogs drop anything derived from item data
+            self.bot.dispatch("shop_items_change")
 
     async def _save_shop_items(self):
         """Save shop items to JSON file"""
         try:
             with self.shop_file.open("w") as f:
-                json.dump({"items": self.shop_items}, f, indent=4)
+                json.dump({"version": self.FILE_VERSION, "items": self.shop_items}, f, indent=4)
             return True
         except Exception as e:
             print(f"Error saving shop items: {e}")
             return False
 
+    async def set_inventory(self, user, inventory):
+        """Save a user's inventory and notify other cogs that it changed"""
+        await self.config.user(user).inventory.set(inventory)
+        self.bot.dispatch("shop_inventory_change", user)
+
     async def ensure_ready(self):
         """Ensure shop data is loaded before proceeding"""
         await self.ready.wait()
@@ -249,7 +275,7 @@ class ShopSystem(commands.Cog):
         for _ in range(quantity):
             user_inv.append(item_id)
 
-        await self.config.user(ctx.author).inventory.set(user_inv)
+        await self.set_inventory(ctx.author, user_inv)
 
         # Update limited stock
         if item_data.get("limited", False):
@@ -289,7 +315,7 @@ class ShopSystem(commands.Cog):
         removed = 0
         new_inv = [item for item in user_inv if not (item == item_id and (removed := removed + 1) <= quantity)]
 
-        await self.config.user(ctx.author).inventory.set(new_inv)
+        await self.set_inventory(ctx.author, new_inv)
 
         # Deposit money to user
         await bank.deposit_credits(ctx.author, total_sell_price)
@@ -381,6 +407,10 @@ class ShopSystem(commands.Cog):
             stock = "Unlimited supply"
         embed.add_field(name="Availability", value=stock, inline=False)
 
+        if item_stats := item_data.get("stats"):
+            bonuses = "\n".join(f"+{value} {stat.replace('_', ' ').title()}" for stat, value in item_stats.items())
+            embed.add_field(name=f"Combat Stats ({item_data.get('slot', item_id)})", value=bonuses, inline=False)
+
         # Add image if available
         if image_url := item_data.get("image_url"):
             embed.set_image(url=image_url)
@@ -466,7 +496,7 @@ class ShopSystem(commands.Cog):
 
         # Transfer item
         buyer_inv.append(listing["item_id"])
-        await self.config.user(ctx.author).inventory.set(buyer_inv)
+        await self.set_inventory(ctx.author, buyer_inv)
 
         # Remove listing
         market_data = [l for l in market_data if l["id"] != listing_id]
@@ -499,7 +529,7 @@ class ShopSystem(commands.Cog):
 
         # Remove item from inventory
         user_inv.remove(item_id)
-        await self.config.user(ctx.author).inventory.set(user_inv)
+        await self.set_inventory(ctx.author, user_inv)
 
         # Create listing
         new_listing = {
@@ -624,6 +654,43 @@ class ShopSystem(commands.Cog):
         else:
             await ctx.send("❌ Failed to save shop items!")
 
+    @checks.admin()
+    @commands.command()
+    async def shopgear(self, ctx, item_id: str, slot: str, *stats: str):
+        """Set an item's equipment slot and combat stats (Admin only)
+
+        Stats are `attack`, `defense` and `max_health`. Use `none` as the slot to make it a plain item.
+        Example: !shopgear sword weapon attack=5 defense=1
+        """
+        await self.ensure_ready()
+        item_id = item_id.lower()
+        if item_id not in self.shop_items:
+            return await ctx.send("❌ Item not found!")
+
+        item_data = self.shop_items[item_id]
+        if slot.lower() == "none":
+            item_data.pop("slot", None)
+            item_data.pop("stats", None)
+        else:
+            bonuses = {}
+            for stat in stats:
+                name, _, value = stat.partition("=")
+                name = name.lower()
+                if name not in self.COMBAT_STATS or not value.lstrip("-").isdigit():
+                    return await ctx.send(f"❌ Invalid stat `{stat}`! Use e.g. `attack=5` ({', '.join(self.COMBAT_STATS)})")
+                bonuses[name] = int(value)
+            if not bonuses:
+                return await ctx.send("❌ Give at least one stat, e.g. `attack=5`!")
+            item_data["slot"] = slot.lower()
+            item_data["stats"] = bonuses
+
+        if await self._save_shop_items():
+            # Equipped stats are cached by other cogs
+            self.bot.dispatch("shop_items_change")
+            await ctx.send(f"✅ Updated combat stats for {item_data['name']}!")
+        else:
+            await ctx.send("❌ Failed to save shop items!")
+
     @checks.admin()
     @commands.command()
     async def shoprestock(self, ctx, item_id: str, quantity: int):
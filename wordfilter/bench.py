@@ -0,0 +1,75 @@
+"""Word filter normalization benchmark
+
+Run from the repo root with `python -m wordfilter.bench`.
+"""
+import random
+import sys
+import time
+
+from .normalize import Normalizer, normalize_reference
+
+WORDS = (
+    "hey", "what", "is", "up", "lol", "anyone", "playing", "tonight", "gg", "that", "was",
+    "close", "the", "server", "is", "lagging", "again", "can", "someone", "help", "me",
+    "with", "this", "quest", "thanks", "nice", "one", "see", "you", "later", "brb",
+)
+ACCENTED = (
+    "café", "naïve", "über", "señor", "mañana", "crème", "brûlée", "garçon", "façade",
+    "jalapeño", "résumé", "Ålesund", "Straße", "tiếng", "việt", "ｆｕｌｌｗｉｄｔｈ",
+)
+EMOJI = ("😂", "🔥", "👍", "💀", "🎉", "❤️")
+SPAM = (
+    "FREE NITRO!!! claim at discord-gift.example 🎁",
+    "𝔣𝔯𝔢𝔢 𝔫𝔦𝔱𝔯𝔬 click here",
+    "join my server for free robux!!!",
+)
+
+
+def corpus(size=100_000, spam=0.1, seed=0):
+    """Chat-like messages: mostly plain ASCII, some accents and emoji, repeated spam"""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(size):
+        if rng.random() < spam:
+            messages.append(rng.choice(SPAM))
+            continue
+        roll = rng.random()
+        words = [rng.choice(WORDS) for _ in range(rng.randint(2, 20))]
+        if roll < 0.25:
+            words[rng.randrange(len(words))] = rng.choice(ACCENTED)
+        if roll < 0.35:
+            words.append(rng.choice(EMOJI))
+        if rng.random() < 0.3:
+            words[0] = words[0].capitalize()
+        messages.append(" ".join(words))
+    return messages
+
+
+def timed(func, messages):
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return time.perf_counter() - start
+
+
+def bench_corpus(out, title, messages):
+    normalizer = Normalizer()
+    mismatches = sum(normalize_reference(m) != normalizer.normalize(m) for m in messages)
+    out.write(f"== {title} ==\n{len(messages):,} messages, {mismatches} mismatches against the reference\n")
+
+    reference = timed(normalize_reference, messages)
+    fast = timed(normalizer.normalize, messages)
+    memo = timed(Normalizer(), messages)
+    for name, elapsed in (("reference", reference), ("fast path", fast), ("fast + memo", memo)):
+        out.write(f"{name:<12} {elapsed * 1e6 / len(messages):>7.2f} µs/message  "
+                  f"{reference / elapsed:>5.1f}x\n")
+
+
+def main(out=sys.stdout):
+    bench_corpus(out, "Normal chat (10% spam)", corpus())
+    out.write("\n")
+    bench_corpus(out, "Spam wave (80% spam)", corpus(spam=0.8))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from collections import deque
+from typing import Iterable, Optional
+
+
+class Matcher:
+    """Aho–Corasick automaton over a guild's normalized blacklist
+
+    Built once when the blacklist changes. `search` then finds a filtered
+    word in a single pass over the text, however many words are listed.
+
+    With `whole_words`, patterns only match between word boundaries. The
+    text is expected to use spaces as separators (see `build_table`); each
+    pattern and the text are padded with a space, so boundary matches still
+    come out of the same single pass.
+    """
+
+    __slots__ = ("patterns", "whole_words", "goto", "fail", "out")
+
+    def __init__(self, patterns: Iterable[str], whole_words: bool = False):
+        self.whole_words = whole_words
+        patterns = (" ".join(p.split()) for p in patterns) if whole_words else patterns
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        keys = [f" {p} " for p in self.patterns] if whole_words else self.patterns
+        self.goto = [{}]  # Trie edges per state
+        self.out = [-1]   # Index of a pattern ending at each state, or -1
+
+        for index, pattern in enumerate(keys):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.out.append(-1)
+                state = next_state
+            if self.out[state] < 0:
+                self.out[state] = index
+
+        # Breadth-first failure links; a state also reports the matches of its fallback
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.out[next_state] < 0:
+                    self.out[next_state] = self.out[self.fail[next_state]]
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def search(self, text: str) -> Optional[str]:
+        """The first filtered word found in `text`, or None"""
+        goto, fail, out = self.goto, self.fail, self.out
+        if self.whole_words:
+            text = f" {' '.join(text.split())} "
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state] >= 0:
+                return self.patterns[out[state]]
+        return None
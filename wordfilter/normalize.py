@@ -0,0 +1,135 @@
+import unicodedata
+from collections import OrderedDict
+from typing import Dict
+
+
+def normalize_reference(text: str) -> str:
+    """Lowercase, remove diacritics and drop anything that isn't ASCII
+
+    The original per-character implementation, kept as the definition the
+    fast path must agree with.
+    """
+    # Normalize to NFKD form which separates characters and diacritics
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    # Remove diacritical marks and convert to ASCII
+    cleaned = ''.join(c for c in normalized if not unicodedata.combining(c))
+    # Remove non-ASCII characters and return
+    return cleaned.encode('ascii', 'ignore').decode('ascii')
+
+
+# Blocks covering the accented letters, combining marks and fullwidth forms seen in chat
+TABLE_RANGES = (
+    (0x0000, 0x0080),   # ASCII, mapped to itself so lookups never miss
+    (0x0080, 0x0250),   # Latin-1 Supplement, Latin Extended-A and B
+    (0x0300, 0x0370),   # Combining diacritical marks
+    (0x1E00, 0x1F00),   # Latin Extended Additional
+    (0xFF01, 0xFF5F),   # Fullwidth ASCII
+)
+
+
+# Digits and symbols commonly used as letters
+LEET = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "@": "a", "$": "s"}
+
+# Lowercase Cyrillic and Greek letters that look like Latin ones
+HOMOGLYPHS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j", "ѕ": "s", "ԁ": "d",
+    "ԛ": "q", "ԝ": "w", "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+}
+
+
+class FoldTable(dict):
+    """A str.translate table giving the normalized form of each codepoint
+
+    NFKD decomposes every character on its own and only reorders combining
+    marks, which are dropped anyway, so normalizing character by character
+    gives the same result as normalizing the whole text. The ASCII result
+    then goes through `ascii_map` (leetspeak, word separators). Codepoints
+    outside the precomputed blocks are looked up once and then kept.
+
+    With `separators`, a character with no ASCII form (emoji, dashes, CJK
+    punctuation) separates words instead of vanishing, unless it is a
+    combining mark or an invisible format character.
+    """
+
+    def __init__(self, ascii_map: Dict[str, str], extra: Dict[str, str], separators: bool = False):
+        super().__init__()
+        self.ascii_map = ascii_map
+        self.extra = extra
+        self.separators = separators
+
+    def fold(self, char: str) -> str:
+        folded = self.extra.get(char)
+        if folded is None:
+            folded = normalize_reference(char)
+            if (not folded and self.separators and not unicodedata.combining(char)
+                    and unicodedata.category(char) != "Cf"):
+                return " "
+        return "".join(self.ascii_map.get(c, c) for c in folded)
+
+    def __missing__(self, codepoint: int) -> str:
+        folded = self[codepoint] = self.fold(chr(codepoint))
+        return folded
+
+
+def build_table(fold: bool = False, separators: bool = False) -> FoldTable:
+    """Translate table for a normalization mode
+
+    `fold` maps leetspeak and lookalike letters to the letters they imitate.
+    `separators` turns every other non-alphanumeric ASCII character into a
+    space, so words can be matched on their boundaries.
+    """
+    ascii_map = dict(LEET) if fold else {}
+    if separators:
+        for codepoint in range(0x80):
+            char = chr(codepoint)
+            if not char.isalnum() and char not in ascii_map:
+                ascii_map[char] = " "
+    table = FoldTable(ascii_map, HOMOGLYPHS if fold else {}, separators)
+    for start, stop in TABLE_RANGES:
+        for codepoint in range(start, stop):
+            table[codepoint] = table.fold(chr(codepoint))
+    for char in table.extra:
+        table[ord(char)] = table.fold(char)
+    return table
+
+
+class Normalizer:
+    """Fast equivalent of `normalize_reference`, memoizing recent results
+
+    Pure-ASCII text only needs lowercasing, unless folding or separators
+    are enabled; anything else is mapped in one `str.translate` pass. Spam
+    repeats exact messages, so the last `cache_size` non-ASCII results are
+    kept.
+    """
+
+    __slots__ = ("table", "plain", "cache", "cache_size")
+
+    def __init__(self, fold: bool = False, separators: bool = False, cache_size: int = 4096):
+        self.table = build_table(fold, separators)
+        self.plain = not (fold or separators)  # Whether ASCII text only needs lowercasing
+        self.cache = OrderedDict()  # {text: normalized}, most recent last
+        self.cache_size = cache_size
+
+    def __call__(self, text: str) -> str:
+        if text.isascii():
+            # Cheaper than a cache lookup
+            return text.lower() if self.plain else text.lower().translate(self.table)
+        cached = self.cache.get(text)
+        if cached is not None:
+            self.cache.move_to_end(text)
+            return cached
+
+        normalized = self.normalize(text)
+        self.cache[text] = normalized
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return normalized
+
+    def normalize(self, text: str) -> str:
+        """Normalize without the cache"""
+        text = text.lower()
+        if self.plain and text.isascii():
+            return text
+        return text.translate(self.table)
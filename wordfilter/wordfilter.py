@@ -1,26 +1,138 @@
+import asyncio
+import io
 import discord
+from discord.ui import View, Button
 from redbot.core import commands, Config
-import unicodedata
+
+from .matcher import Matcher
+from .normalize import Normalizer
+
+class PaginatorView(View):
+    """View for paginating embeds with navigation buttons"""
+    def __init__(self, embeds, timeout=60):
+        super().__init__(timeout=timeout)
+        self.embeds = embeds
+        self.current_page = 0
+        self.message = None
+
+        # Update button states
+        self.update_buttons()
+
+    def update_buttons(self):
+        """Update button states based on current page"""
+        # Clear existing buttons
+        self.clear_items()
+
+        # Previous button
+        prev_button = Button(emoji="⬅️", style=discord.ButtonStyle.secondary,
+                            disabled=self.current_page == 0)
+        prev_button.callback = self.previous_page
+        self.add_item(prev_button)
+
+        # Page counter
+        page_button = Button(label=f"{self.current_page+1}/{len(self.embeds)}",
+                            style=discord.ButtonStyle.primary, disabled=True)
+        self.add_item(page_button)
+
+        # Next button
+        next_button = Button(emoji="➡️", style=discord.ButtonStyle.secondary,
+                            disabled=self.current_page == len(self.embeds)-1)
+        next_button.callback = self.next_page
+        self.add_item(next_button)
+
+    async def previous_page(self, interaction):
+        """Go to previous page"""
+        if self.current_page > 0:
+            self.current_page -= 1
+            self.update_buttons()
+            await interaction.response.edit_message(embed=self.embeds[self.current_page], view=self)
+
+    async def next_page(self, interaction):
+        """Go to next page"""
+        if self.current_page < len(self.embeds) - 1:
+            self.current_page += 1
+            self.update_buttons()
+            await interaction.response.edit_message(embed=self.embeds[self.current_page], view=self)
+
+    async def on_timeout(self):
+        """Disable buttons when view times out"""
+        for item in self.children:
+            item.disabled = True
+        await self.message.edit(view=self)
 
 class WordFilter(commands.Cog):
     """Automatically delete messages containing filtered words"""
 
+    WORDS_PER_PAGE = 40
+    MAX_IMPORT_BYTES = 1024 * 1024
+
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=7345167902)
         default_guild = {
-            "blacklist": []
+            "blacklist": [],
+            "fold": False,  # Catch leetspeak and lookalike letters
+            "whole_words": False  # Only match words on their own, not inside other words
         }
         self.config.register_guild(**default_guild)
+        self.normalizer = Normalizer()
+        self.normalizers = {}  # {(fold, whole_words): Normalizer}, shared by guilds with the same settings
+        self.blacklists = {}  # {guild_id: [word, ...]} mirrored from Config
+        self.normalized = {}  # {guild_id: {normalized word, ...}} for duplicate checks
+        self.modes = {}  # {guild_id: (fold, whole_words)} for guilds not using the defaults
+        self.matchers = {}  # {guild_id: Matcher}, rebuilt when the blacklist changes
+        self.loaded = asyncio.Event()
+        self.bot.loop.create_task(self.load_blacklists())
+
+    async def load_blacklists(self):
+        """Mirror every guild's blacklist into memory and compile it"""
+        try:
+            for guild_id, data in (await self.config.all_guilds()).items():
+                if data["fold"] or data["whole_words"]:
+                    self.modes[guild_id] = (data["fold"], data["whole_words"])
+                if data["blacklist"]:
+                    self.cache_blacklist(guild_id, data["blacklist"])
+        finally:
+            self.loaded.set()
+
+    async def cog_before_invoke(self, ctx):
+        # Commands edit the in-memory copies, so they wait until those are loaded
+        await self.loaded.wait()
+
+    def cache_blacklist(self, guild_id, blacklist):
+        """Replace a guild's in-memory blacklist and its compiled matcher"""
+        if blacklist:
+            self.blacklists[guild_id] = list(blacklist)
+            self.normalized[guild_id] = {self.normalize_text(word) for word in blacklist}
+            self.compile_matcher(guild_id)
+        else:
+            self.blacklists.pop(guild_id, None)
+            self.normalized.pop(guild_id, None)
+            self.matchers.pop(guild_id, None)
+
+    def compile_matcher(self, guild_id):
+        """Rebuild a guild's matcher from its in-memory blacklist and mode"""
+        blacklist = self.blacklists.get(guild_id)
+        if not blacklist:
+            self.matchers.pop(guild_id, None)
+            return
+        mode = self.modes.get(guild_id, (False, False))
+        normalizer = self.normalizer_for(mode)
+        self.matchers[guild_id] = Matcher((normalizer(word) for word in blacklist), whole_words=mode[1])
+
+    def normalizer_for(self, mode):
+        """Normalizer for a (fold, whole_words) mode"""
+        if mode == (False, False):
+            return self.normalizer
+        normalizer = self.normalizers.get(mode)
+        if normalizer is None:
+            fold, whole_words = mode
+            normalizer = self.normalizers[mode] = Normalizer(fold=fold, separators=whole_words)
+        return normalizer
 
     def normalize_text(self, text):
         """Normalize text by converting to lowercase and removing diacritics"""
-        # Normalize to NFKD form which separates characters and diacritics
-        normalized = unicodedata.normalize('NFKD', text.lower())
-        # Remove diacritical marks and convert to ASCII
-        cleaned = ''.join(c for c in normalized if not unicodedata.combining(c))
-        # Remove non-ASCII characters and return
-        return cleaned.encode('ascii', 'ignore').decode('ascii')
+        return self.normalizer(text)
 
     async def check_and_delete(self, message):
         """Check if a message contains filtered words and delete it if found"""
@@ -32,27 +144,27 @@ class WordFilter(commands.Cog):
         ):
             return False
 
-        # Get filtered words for this guild
-        blacklist = await self.config.guild(message.guild).blacklist()
+        # Get the compiled filter for this guild from memory
+        if not self.loaded.is_set():
+            await self.loaded.wait()
+        matcher = self.matchers.get(message.guild.id)
 
-        if not blacklist:
+        if not matcher:
             return False
 
-        # Normalize message content for better matching
-        normalized_content = self.normalize_text(message.content)
-
-        # Check if message contains any filtered word
-        for bad_word in blacklist:
-            # Normalize the bad word too for consistency
-            normalized_bad = self.normalize_text(bad_word)
-            if normalized_bad and normalized_bad in normalized_content:
-                try:
-                    await message.delete()
-                    return True
-                except discord.NotFound:
-                    pass  # Message already deleted
-                except discord.Forbidden:
-                    pass  # Missing permissions
+        # Normalize message content for better matching, then scan it once for every filtered word
+        normalizer = self.normalizer_for(self.modes.get(message.guild.id, (False, False)))
+        normalized_content = normalizer(message.content)
+        if matcher.search(normalized_content) is None:
+            return False
+
+        try:
+            await message.delete()
+            return True
+        except discord.NotFound:
+            pass  # Message already deleted
+        except discord.Forbidden:
+            pass  # Missing permissions
         return False
 
     @commands.Cog.listener()
@@ -81,24 +193,30 @@ class WordFilter(commands.Cog):
             await ctx.send("Word must be at least 2 characters long.")
             return
 
+        normalized = self.normalize_text(word)
         async with self.config.guild(ctx.guild).blacklist() as blacklist:
             # Check both original and normalized versions for duplicates
-            normalized_new = self.normalize_text(word)
-            for existing in blacklist:
-                if self.normalize_text(existing) == normalized_new:
-                    await ctx.send(f"`{word}` or a similar variation is already in the word filter.")
-                    return
+            if normalized in self.normalized.get(ctx.guild.id, ()):
+                await ctx.send(f"`{word}` or a similar variation is already in the word filter.")
+                return
             blacklist.append(word)
+            self.blacklists.setdefault(ctx.guild.id, []).append(word)
+            self.normalized.setdefault(ctx.guild.id, set()).add(normalized)
+            self.compile_matcher(ctx.guild.id)
 
         await ctx.send(f"Added `{word}` to the word filter.")
 
     @wordfilter.command(name="remove", aliases=["rm", "delete"])
     async def wordfilter_remove(self, ctx, *, word: str):
         """Remove a word from the filter"""
+        # Normalize the word to remove
+        normalized_target = self.normalize_text(word)
+        if normalized_target not in self.normalized.get(ctx.guild.id, ()):
+            await ctx.send(f"`{word}` or its variations were not found in the word filter.")
+            return
+
         async with self.config.guild(ctx.guild).blacklist() as blacklist:
             original_length = len(blacklist)
-            # Normalize the word to remove
-            normalized_target = self.normalize_text(word)
             # Case-insensitive and accent-insensitive removal
             blacklist[:] = [w for w in blacklist
                            if self.normalize_text(w) != normalized_target]
@@ -106,25 +224,123 @@ class WordFilter(commands.Cog):
             if len(blacklist) == original_length:
                 await ctx.send(f"`{word}` or its variations were not found in the word filter.")
                 return
+            if blacklist:
+                self.blacklists[ctx.guild.id] = list(blacklist)
+                self.normalized[ctx.guild.id].discard(normalized_target)
+                self.compile_matcher(ctx.guild.id)
+            else:
+                self.cache_blacklist(ctx.guild.id, blacklist)
 
         await ctx.send(f"Removed all variations of `{word}` from the word filter.")
 
+    @wordfilter.command(name="fold")
+    async def wordfilter_fold(self, ctx, enabled: bool):
+        """Also catch leetspeak and lookalike letters, like `h3ll0` or Cyrillic `е`"""
+        await self.config.guild(ctx.guild).fold.set(enabled)
+        self.set_mode(ctx.guild, fold=enabled)
+        await ctx.send(f"Leetspeak and lookalike folding {'enabled' if enabled else 'disabled'}.")
+
+    @wordfilter.command(name="wholewords")
+    async def wordfilter_wholewords(self, ctx, enabled: bool):
+        """Only match filtered words on their own, not inside other words"""
+        await self.config.guild(ctx.guild).whole_words.set(enabled)
+        self.set_mode(ctx.guild, whole_words=enabled)
+        await ctx.send(f"Whole-word matching {'enabled' if enabled else 'disabled'}.")
+
+    def set_mode(self, guild, **changes):
+        """Update a guild's cached matching mode and recompile its filter"""
+        fold, whole_words = self.modes.get(guild.id, (False, False))
+        fold = changes.get("fold", fold)
+        whole_words = changes.get("whole_words", whole_words)
+        if fold or whole_words:
+            self.modes[guild.id] = (fold, whole_words)
+        else:
+            self.modes.pop(guild.id, None)
+        self.compile_matcher(guild.id)
+
+    @wordfilter.command(name="import")
+    async def wordfilter_import(self, ctx):
+        """Add words from an attached text file, one per line"""
+        if not ctx.message.attachments:
+            await ctx.send("Attach a text file with one word per line.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > self.MAX_IMPORT_BYTES:
+            await ctx.send("That file is too large (1 MB max).")
+            return
+
+        try:
+            content = (await attachment.read()).decode("utf-8", errors="replace")
+        except discord.HTTPException as e:
+            await ctx.send(f"Couldn't read the attachment: {e}")
+            return
+
+        added = skipped = 0
+        async with self.config.guild(ctx.guild).blacklist() as blacklist:
+            seen = set(self.normalized.get(ctx.guild.id, ()))
+            for line in content.splitlines():
+                word = line.strip()
+                if len(word) < 2:
+                    continue
+                normalized = self.normalize_text(word)
+                if not normalized or normalized in seen:
+                    skipped += 1
+                    continue
+                seen.add(normalized)
+                blacklist.append(word)
+                added += 1
+
+            if added:
+                self.blacklists[ctx.guild.id] = list(blacklist)
+                self.normalized[ctx.guild.id] = seen
+                self.compile_matcher(ctx.guild.id)
+        await ctx.send(
+            f"Imported {added} word(s) into the word filter"
+            f"{f', skipped {skipped} duplicate(s)' if skipped else ''}. "
+            f"The filter now has {len(blacklist)} word(s)."
+        )
+
+    @wordfilter.command(name="export")
+    async def wordfilter_export(self, ctx):
+        """Export the filtered words as a text file"""
+        blacklist = self.blacklists.get(ctx.guild.id, [])
+        if not blacklist:
+            await ctx.send("The word filter is empty.")
+            return
+
+        data = io.BytesIO("\n".join(blacklist).encode("utf-8"))
+        await ctx.send(
+            f"{len(blacklist)} filtered word(s).",
+            file=discord.File(data, filename=f"wordfilter-{ctx.guild.id}.txt")
+        )
+
     @wordfilter.command(name="list")
     async def wordfilter_list(self, ctx):
         """List all filtered words"""
-        blacklist = await self.config.guild(ctx.guild).blacklist()
+        blacklist = self.blacklists.get(ctx.guild.id, [])
 
         if not blacklist:
             await ctx.send("The word filter is empty.")
             return
 
-        formatted_list = "\n".join(f"• {word}" for word in blacklist)
-        embed = discord.Embed(
-            title="Filtered Words",
-            description=formatted_list,
-            color=await ctx.embed_color()
-        )
-        await ctx.send(embed=embed)
+        color = await ctx.embed_color()
+        pages = (len(blacklist) + self.WORDS_PER_PAGE - 1) // self.WORDS_PER_PAGE
+        embeds = []
+        for page in range(pages):
+            page_words = blacklist[page * self.WORDS_PER_PAGE:(page + 1) * self.WORDS_PER_PAGE]
+            embed = discord.Embed(
+                title=f"Filtered Words - Page {page+1}/{pages}",
+                description="\n".join(f"• {word[:80]}" for word in page_words),
+                color=color
+            )
+            embed.set_footer(text=f"{len(blacklist)} words")
+            embeds.append(embed)
+
+        if len(embeds) == 1:
+            await ctx.send(embed=embeds[0])
+            return
+        view = PaginatorView(embeds)
+        view.message = await ctx.send(embed=embeds[0], view=view)
 
     @wordfilter.command(name="clear")
     @commands.admin_or_permissions(administrator=True)
@@ -159,6 +375,7 @@ class WordFilter(commands.Cog):
         # Process reaction
         if str(reaction.emoji) == "✅":
             await self.config.guild(ctx.guild).blacklist.set([])
+            self.cache_blacklist(ctx.guild.id, [])
             await ctx.send("✅ All words have been removed from the filter.")
         else:
             await ctx.send("❌ Clear operation cancelled.")